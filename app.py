@@ -1,12 +1,24 @@
 import os
+import re
+import json
+import base64
 import time
+import bisect
+import sqlite3
+import threading
 import random
 import logging
+import click
 from logging.handlers import RotatingFileHandler
-from datetime import datetime
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from functools import wraps
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, g, has_request_context, abort
+from flask.cli import AppGroup
 from flask_sqlalchemy import SQLAlchemy
-from sqlalchemy.sql import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
 from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_migrate import Migrate
@@ -14,6 +26,7 @@ from werkzeug.utils import secure_filename
 from geopy.geocoders import Nominatim
 from flask_socketio import SocketIO, send
 from jinja2 import DictLoader
+import numpy as np
 from textblob import TextBlob
 import sentry_sdk
 from sentry_sdk.integrations.flask import FlaskIntegration
@@ -29,12 +42,60 @@ sentry_sdk.init(
 app = Flask(__name__)
 basedir = os.path.abspath(os.path.dirname(__file__))
 DATABASE_URI = 'sqlite:///' + os.path.join(basedir, 'database.db')
-app.config['SQLALCHEMY_DATABASE_URI'] = DATABASE_URI
+app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', DATABASE_URI)
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SECRET_KEY'] = os.environ.get("SECRET_KEY", "dev")
 UPLOAD_FOLDER = os.path.join(basedir, 'static/uploads')
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
+# Geocoding runs in a background worker; the map routes only read stored coordinates.
+app.config['GEOCODE_WORKER_AUTOSTART'] = os.environ.get('GEOCODE_WORKER_AUTOSTART', '1') == '1'
+app.config['GEOCODE_WORKER_IDLE_SECONDS'] = float(os.environ.get('GEOCODE_WORKER_IDLE_SECONDS', 5))
+app.config['GEOCODE_BATCH_SIZE'] = int(os.environ.get('GEOCODE_BATCH_SIZE', 20))
+app.config['GEOCODE_MAX_ATTEMPTS'] = int(os.environ.get('GEOCODE_MAX_ATTEMPTS', 5))
+app.config['GEOCODE_CACHE_TTL_DAYS'] = int(os.environ.get('GEOCODE_CACHE_TTL_DAYS', 180))
+app.config['GEOCODE_NEGATIVE_TTL_HOURS'] = int(os.environ.get('GEOCODE_NEGATIVE_TTL_HOURS', 24))
+# Providers tried in order; use 'gazetteer' alone for offline/air-gapped deployments.
+app.config['GEOCODE_PROVIDERS'] = os.environ.get('GEOCODE_PROVIDERS', 'gazetteer,nominatim')
+# Token bucket shared by every thread and worker process (Nominatim allows 1 request/second).
+app.config['GEOCODE_RATE_PER_SECOND'] = float(os.environ.get('GEOCODE_RATE_PER_SECOND', 1.0))
+app.config['GEOCODE_RATE_BURST'] = float(os.environ.get('GEOCODE_RATE_BURST', 1.0))
+app.config['GEOCODE_BACKFILL_CONCURRENCY'] = int(os.environ.get('GEOCODE_BACKFILL_CONCURRENCY', 4))
+# Upper bound on features returned by one viewport query on the maps.
+app.config['MAP_MAX_FEATURES'] = int(os.environ.get('MAP_MAX_FEATURES', 2000))
+# Below this zoom the maps get server-side clusters instead of individual markers.
+app.config['MAP_CLUSTER_MAX_ZOOM'] = int(os.environ.get('MAP_CLUSTER_MAX_ZOOM', 16))
+app.config['MAP_TILE_CACHE_SIZE'] = int(os.environ.get('MAP_TILE_CACHE_SIZE', 4096))
+app.config['MAP_TILE_CACHE_SECONDS'] = int(os.environ.get('MAP_TILE_CACHE_SECONDS', 60))
+# Fixed heatmap grid over greater Bengaluru: (south, west, north, east) and cell size in degrees.
+app.config['HEATMAP_BOUNDS'] = (12.75, 77.35, 13.25, 77.85)
+app.config['HEATMAP_CELL_DEGREES'] = float(os.environ.get('HEATMAP_CELL_DEGREES', 0.005))
+app.config['HEATMAP_REBUILD_SECONDS'] = int(os.environ.get('HEATMAP_REBUILD_SECONDS', 300))
+# Time windows (days) the heatmap accepts, and how many (animal type, window) grids stay in memory.
+app.config['HEATMAP_WINDOWS_DAYS'] = (1, 7, 30, 90, 365)
+app.config['HEATMAP_MAX_GRIDS'] = int(os.environ.get('HEATMAP_MAX_GRIDS', 64))
+# Analytics payload cache: always an in-process LRU, optionally backed by a shared SQLite file.
+app.config['STATS_CACHE_BACKEND'] = os.environ.get('STATS_CACHE_BACKEND', 'memory')  # 'memory' or 'sqlite'
+app.config['STATS_CACHE_PATH'] = os.environ.get('STATS_CACHE_PATH', os.path.join(basedir, 'stats_cache.db'))
+app.config['STATS_CACHE_MAX_ENTRIES'] = int(os.environ.get('STATS_CACHE_MAX_ENTRIES', 512))
+# Keyset pagination for the archive lists (and their JSON variants).
+app.config['LIST_PAGE_SIZE'] = int(os.environ.get('LIST_PAGE_SIZE', 50))
+app.config['LIST_MAX_PAGE_SIZE'] = int(os.environ.get('LIST_MAX_PAGE_SIZE', 200))
+# Views decorated with query_budget raise instead of logging when over budget (always on under TESTING).
+app.config['QUERY_BUDGET_ENFORCE'] = os.environ.get('QUERY_BUDGET_ENFORCE', '0') == '1'
+app.config['RATE_LIMIT_DB_PATH'] = os.environ.get('RATE_LIMIT_DB_PATH', os.path.join(basedir, 'ratelimit.db'))
+# All-time leaderboard ranking held in memory; 'sqlite' shares awards between worker processes on a host.
+app.config['LEADERBOARD_BACKEND'] = os.environ.get('LEADERBOARD_BACKEND', 'memory')  # 'memory' or 'sqlite'
+# Flask-Login loads users from a per-process LRU of detached snapshots instead of the DB.
+app.config['USER_CACHE_SIZE'] = int(os.environ.get('USER_CACHE_SIZE', 1024))
+app.config['USER_CACHE_SECONDS'] = int(os.environ.get('USER_CACHE_SECONDS', 60))
+app.config['LEADERBOARD_PATH'] = os.environ.get('LEADERBOARD_PATH', os.path.join(basedir, 'leaderboard.db'))
+# Password hashing runs on a small dedicated pool; logins beyond workers + max pending get a 503.
+# Stored hashes made with other parameters are upgraded on the user's next successful login.
+app.config['PASSWORD_HASH_METHOD'] = os.environ.get('PASSWORD_HASH_METHOD', 'pbkdf2:sha256')
+app.config['PASSWORD_SALT_LENGTH'] = int(os.environ.get('PASSWORD_SALT_LENGTH', 16))
+app.config['PASSWORD_HASH_WORKERS'] = int(os.environ.get('PASSWORD_HASH_WORKERS', 2))
+app.config['PASSWORD_HASH_MAX_PENDING'] = int(os.environ.get('PASSWORD_HASH_MAX_PENDING', 16))
 
 if not os.path.exists(UPLOAD_FOLDER):
     os.makedirs(UPLOAD_FOLDER)
@@ -56,15 +117,16 @@ def inject_current_year():
 
 # Initialize extensions
 db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+
+def include_in_migrations(obj, name, type_, reflected, compare_to):
+    # The FTS5 search table and its shadow tables are managed by ensure_report_search_index.
+    return not (type_ == 'table' and name and name.startswith('report_fts'))
+
+migrate = Migrate(app, db, include_object=include_in_migrations)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 socketio = SocketIO(app)
 
-@login_manager.user_loader
-def load_user(user_id):
-    return User.query.get(int(user_id))
-
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
@@ -81,10 +143,10 @@ event_participants = db.Table(
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(50), unique=True, nullable=False)
-    password = db.Column(db.String(100), nullable=False)
+    password = db.Column(db.String(255), nullable=False)
     email = db.Column(db.String(100), unique=True, nullable=False)
     role = db.Column(db.String(20), default='donor')
-    points = db.Column(db.Integer, default=0)
+    points = db.Column(db.Integer, default=0, index=True)
 
     def __repr__(self):
         return f'<User {self.username}>'
@@ -96,38 +158,131 @@ class Donation(db.Model):
     quantity = db.Column(db.Integer)
     pickup_location = db.Column(db.String(200))
     pickup_time = db.Column(db.DateTime)
-    donor_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    donor_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     donor = db.relationship('User', backref=db.backref('donations', lazy=True))
     pickup_latitude = db.Column(db.Float, nullable=True)
     pickup_longitude = db.Column(db.Float, nullable=True)
+    pickup_geohash = db.Column(db.String(12), nullable=True, index=True)
+    __table_args__ = (db.Index('ix_donation_pickup_time_id', 'pickup_time', 'id'),)
 
 class Report(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    animal_type = db.Column(db.String(50), nullable=False)
+    animal_type = db.Column(db.String(50), nullable=False, index=True)
+    # normalize_category(animal_type): the facet key the map and heatmap filter on.
+    animal_type_key = db.Column(db.String(50), index=True,
+                                default=lambda ctx: normalize_category(ctx.get_current_parameters()['animal_type']))
     description = db.Column(db.String(200), nullable=False)
     location = db.Column(db.String(200), nullable=False)
     contact = db.Column(db.String(100), nullable=False)
-    report_time = db.Column(db.DateTime(timezone=True), server_default=func.now())
-    reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    # Set in Python so SQLite stores the same microsecond text format SQLAlchemy binds cursors with.
+    report_time = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+    reporter_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
     reporter = db.relationship('User', backref=db.backref('reports', lazy=True))
     image_filename = db.Column(db.String(100))
     latitude = db.Column(db.Float, nullable=True)
     longitude = db.Column(db.Float, nullable=True)
+    geohash = db.Column(db.String(12), nullable=True, index=True)
+    __table_args__ = (db.Index('ix_report_report_time_id', 'report_time', 'id'),)
 
 class Event(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
     description = db.Column(db.String(300))
-    event_time = db.Column(db.DateTime, nullable=False)
+    event_time = db.Column(db.DateTime, nullable=False, index=True)
     location = db.Column(db.String(200), nullable=False)
     participants = db.relationship('User', secondary=event_participants, backref=db.backref('events', lazy='dynamic'))
 
 class Feedback(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), index=True)
     message = db.Column(db.String(500))
     submitted_at = db.Column(db.DateTime, default=datetime.utcnow)
     user = db.relationship('User', backref=db.backref('feedbacks', lazy=True))
+    # TextBlob scores, filled in off the request path; NULL until scored.
+    polarity = db.Column(db.Float, nullable=True)
+    subjectivity = db.Column(db.Float, nullable=True)
+    __table_args__ = (db.Index('ix_feedback_submitted_at_id', 'submitted_at', 'id'),)
+
+class PointsLedger(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False, index=True)
+    points = db.Column(db.Integer, nullable=False)
+    reason = db.Column(db.String(20), nullable=False)  # 'donation' or 'report'
+    event_id = db.Column(db.Integer, db.ForeignKey('event.id'), nullable=True, index=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    __table_args__ = (db.Index('ix_points_ledger_created_at_user_id', 'created_at', 'user_id'),)
+
+class LeaderboardTotal(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    board = db.Column(db.String(30), nullable=False)  # 'week:2026-10-12', 'month:2026-10-01' or 'event:7'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    points = db.Column(db.Integer, default=0, nullable=False)
+    __table_args__ = (db.UniqueConstraint('board', 'user_id', name='uq_leaderboard_total_board_user_id'),
+                      db.Index('ix_leaderboard_total_board_points', 'board', 'points'))
+
+class DailyDonationRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    food_type = db.Column(db.String(50), nullable=False)
+    donation_count = db.Column(db.Integer, default=0, nullable=False)
+    quantity_sum = db.Column(db.Integer, default=0, nullable=False)
+    __table_args__ = (db.UniqueConstraint('day', 'food_type', name='uq_daily_donation_rollup_day_food_type'),)
+
+class DailyReportRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False)
+    animal_type = db.Column(db.String(50), nullable=False)
+    report_count = db.Column(db.Integer, default=0, nullable=False)
+    __table_args__ = (db.UniqueConstraint('day', 'animal_type', name='uq_daily_report_rollup_day_animal_type'),)
+
+class DailySentimentRollup(db.Model):
+    day = db.Column(db.Date, primary_key=True)
+    feedback_count = db.Column(db.Integer, default=0, nullable=False)
+    polarity_sum = db.Column(db.Float, default=0.0, nullable=False)
+    subjectivity_sum = db.Column(db.Float, default=0.0, nullable=False)
+    negative_count = db.Column(db.Integer, default=0, nullable=False)
+
+class AnimalTypeFacet(db.Model):
+    animal_type = db.Column(db.String(50), primary_key=True)
+    report_count = db.Column(db.Integer, default=0, nullable=False)
+
+class CacheVersion(db.Model):
+    tag = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, default=0, nullable=False)
+
+class GeocodeJob(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    target_type = db.Column(db.String(20), nullable=False)  # 'report' or 'donation'
+    target_id = db.Column(db.Integer, nullable=False)
+    address = db.Column(db.String(200), nullable=False)
+    status = db.Column(db.String(20), default='pending', nullable=False, index=True)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    last_error = db.Column(db.String(200))
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow, index=True)
+
+class BackfillCheckpoint(db.Model):
+    name = db.Column(db.String(50), primary_key=True)
+    last_id = db.Column(db.Integer, default=0, nullable=False)
+    processed = db.Column(db.Integer, default=0, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class GeocodeCache(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    normalized_address = db.Column(db.String(200), unique=True, nullable=False, index=True)
+    latitude = db.Column(db.Float, nullable=True)
+    longitude = db.Column(db.Float, nullable=True)
+    provider = db.Column(db.String(50))
+    is_negative = db.Column(db.Boolean, default=False, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+
+    def is_expired(self, now=None):
+        now = now or datetime.utcnow()
+        if self.is_negative or (self.provider or '').endswith(':approximate'):
+            ttl = timedelta(hours=app.config['GEOCODE_NEGATIVE_TTL_HOURS'])
+        else:
+            ttl = timedelta(days=app.config['GEOCODE_CACHE_TTL_DAYS'])
+        return self.updated_at + ttl < now
 
 # --- Helper Functions ---
 def send_notification(subject, recipients, body):
@@ -139,6 +294,1471 @@ def post_to_twitter(message):
 def check_proximity(report):
     app.logger.info(f"Proximity Alert: New report near you: {report.location}")
 
+# --- Keyset Pagination ---
+def encode_cursor(timestamp, row_id):
+    payload = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor):
+    """Inverse of encode_cursor; raises ValueError on a malformed cursor."""
+    try:
+        timestamp, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return (datetime.fromisoformat(timestamp) if timestamp else None), int(row_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"invalid cursor: {e}")
+
+def requested_page_size():
+    per_page = request.args.get('per_page', type=int) or app.config['LIST_PAGE_SIZE']
+    return max(1, min(per_page, app.config['LIST_MAX_PAGE_SIZE']))
+
+def keyset_page(query, time_col, id_col, cursor, per_page):
+    """Newest-first page after `cursor`, seeking on (time_col, id_col). Returns (rows, next_cursor)."""
+    cursor_time, cursor_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if cursor_time is not None or cursor_id is None:
+        dated = query.filter(time_col.isnot(None))
+        if cursor_time is not None:
+            dated = dated.filter(db.or_(time_col < cursor_time,
+                                        db.and_(time_col == cursor_time, id_col < cursor_id)))
+        rows = dated.order_by(time_col.desc(), id_col.desc()).limit(per_page + 1).all()
+    if len(rows) <= per_page:
+        undated = query.filter(time_col.is_(None))
+        if cursor_time is None and cursor_id is not None:
+            undated = undated.filter(id_col < cursor_id)
+        rows += undated.order_by(id_col.desc()).limit(per_page + 1 - len(rows)).all()
+    if len(rows) <= per_page:
+        return rows, None
+    rows = rows[:per_page]
+    last = rows[-1]
+    return rows, encode_cursor(getattr(last, time_col.key), last.id)
+
+def normalize_report_times():
+    """Pad second-resolution SQLite report times so they compare correctly as text. Returns rows rewritten."""
+    if db.engine.dialect.name != 'sqlite':
+        return 0
+    with db.engine.begin() as conn:
+        return conn.exec_driver_sql("UPDATE report SET report_time = report_time || '.000000' "
+                                    "WHERE length(report_time) = 19").rowcount
+
+@app.cli.command('normalize-report-times')
+def normalize_report_times_command():
+    """One-off repair of report times written by the old CURRENT_TIMESTAMP default (SQLite only)."""
+    click.echo(f"Normalized {normalize_report_times()} report times")
+
+# --- Analytics ---
+def period_bucket(column, granularity):
+    """SQL expression truncating a date column to the start of its day, ISO week or month."""
+    if granularity == 'day':
+        return column
+    if db.engine.dialect.name == 'sqlite':
+        if granularity == 'week':
+            return db.func.date(column, '-6 days', 'weekday 1')
+        return db.func.date(column, 'start of month')
+    return db.func.date(db.func.date_trunc(granularity, column))
+
+# metric name -> (rollup model, summed column, columns allowed for group_by)
+STATS_METRICS = {
+    'donations': (DailyDonationRollup, 'donation_count', ('food_type',)),
+    'quantity': (DailyDonationRollup, 'quantity_sum', ('food_type',)),
+    'reports': (DailyReportRollup, 'report_count', ('animal_type',)),
+}
+STATS_GRANULARITIES = ('day', 'week', 'month')
+# Cache version tag whose bump invalidates each metric.
+STATS_METRIC_TAGS = {'donations': 'donations', 'quantity': 'donations', 'reports': 'reports'}
+
+def stats_series(metric, start=None, end=None, granularity='day', group_by=None):
+    """A rollup metric as {'labels': [...], 'series': {group: [...]}}; an ungrouped series is named 'all'."""
+    model, value_attr, _ = STATS_METRICS[metric]
+    period = period_bucket(model.day, granularity)
+    columns = [period, db.func.sum(getattr(model, value_attr))]
+    if group_by:
+        columns.insert(1, getattr(model, group_by))
+    query = db.session.query(*columns)
+    if start:
+        query = query.filter(model.day >= start)
+    if end:
+        query = query.filter(model.day <= end)
+    group_columns = [period] + ([getattr(model, group_by)] if group_by else [])
+    rows = query.group_by(*group_columns).order_by(period).all()
+    labels, series = [], {}
+    for row in rows:
+        label = str(_as_date(row[0]))
+        if not labels or labels[-1] != label:
+            labels.append(label)
+        name = row[1] if group_by else 'all'
+        series.setdefault(name, {})[label] = row[-1] or 0
+    return {'labels': labels, 'series': {name: [values.get(label, 0) for label in labels]
+                                         for name, values in series.items()}}
+
+def dashboard_stats():
+    """Monthly donation/report counts and all-time totals for stats.html, from the rollups."""
+    donation_month = period_bucket(DailyDonationRollup.day, 'month')
+    donation_rows = (db.session.query(donation_month, db.func.sum(DailyDonationRollup.donation_count),
+                                      db.func.sum(DailyDonationRollup.quantity_sum))
+                     .group_by(donation_month).order_by(donation_month).all())
+    report_month = period_bucket(DailyReportRollup.day, 'month')
+    report_rows = (db.session.query(report_month, db.func.sum(DailyReportRollup.report_count))
+                   .group_by(report_month).order_by(report_month).all())
+    return {
+        'donation_data': {'labels': [str(_as_date(month))[:7] for month, _, _ in donation_rows],
+                          'counts': [count for _, count, _ in donation_rows]},
+        'report_data': {'labels': [str(_as_date(month))[:7] for month, _ in report_rows],
+                        'counts': [count for _, count in report_rows]},
+        'total_donations': sum(count for _, count, _ in donation_rows),
+        'total_quantity': sum(quantity or 0 for _, _, quantity in donation_rows),
+    }
+
+def normalize_category(value):
+    """Rollup/facet key for free-text categories such as animal_type and food_type."""
+    return ' '.join((value or '').split()).lower()[:50] or 'unknown'
+
+def _as_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+def upsert(model, key, values, insert_values=None):
+    """UPDATE the row for `key`, else INSERT it in a savepoint, falling back to the UPDATE on a conflict."""
+    query = model.query.filter_by(**key)
+    if query.update(values, synchronize_session=False):
+        return
+    try:
+        with db.session.begin_nested():
+            db.session.add(model(**key, **(values if insert_values is None else insert_values)))
+    except IntegrityError:
+        query.update(values, synchronize_session=False)
+
+def upsert_increment(model, key, **increments):
+    """Add `increments` to the counter row for `key`, creating it if needed."""
+    upsert(model, key, {column: getattr(model, column) + amount for column, amount in increments.items()}, increments)
+
+def record_donation_rollup(donation):
+    if donation.pickup_time is None:
+        return
+    upsert_increment(DailyDonationRollup,
+                {'day': donation.pickup_time.date(), 'food_type': normalize_category(donation.food_type)},
+                donation_count=1, quantity_sum=_as_int(donation.quantity))
+    bump_cache_version('donations')
+
+def record_report_rollup(report):
+    reported_at = report.report_time or datetime.utcnow()
+    upsert_increment(DailyReportRollup,
+                {'day': reported_at.date(), 'animal_type': normalize_category(report.animal_type)},
+                report_count=1)
+    bump_cache_version('reports')
+
+def record_animal_type_facet(report):
+    upsert_increment(AnimalTypeFacet, {'animal_type': normalize_category(report.animal_type)}, report_count=1)
+    bump_cache_version('animal_types')
+
+def animal_type_facets():
+    """[{'animal_type', 'count'}] most-reported first, from the facet table via stats_cache."""
+    def compute():
+        rows = AnimalTypeFacet.query.order_by(AnimalTypeFacet.report_count.desc(), AnimalTypeFacet.animal_type).all()
+        return [{'animal_type': row.animal_type, 'count': row.report_count} for row in rows]
+    return stats_cache.get_or_compute('animal_type_facets', None, ['animal_types'], compute)
+
+def rebuild_animal_type_facets():
+    AnimalTypeFacet.query.delete()
+    totals = {}
+    for animal_type, count in db.session.query(Report.animal_type, db.func.count(Report.id)).group_by(Report.animal_type):
+        key = normalize_category(animal_type)
+        totals[key] = totals.get(key, 0) + count
+        Report.query.filter(Report.animal_type == animal_type).update({Report.animal_type_key: key},
+                                                                      synchronize_session=False)
+    db.session.bulk_insert_mappings(AnimalTypeFacet, [
+        {'animal_type': animal_type, 'report_count': count} for animal_type, count in totals.items()
+    ])
+    bump_cache_version('animal_types')
+    db.session.commit()
+    return len(totals)
+
+def _as_date(value):
+    # SQLite's date() returns text; other backends return a date.
+    return datetime.strptime(value, '%Y-%m-%d').date() if isinstance(value, str) else value
+
+def rebuild_rollups():
+    """Recompute both rollup tables from the base tables. Returns (donation rows, report rows)."""
+    DailyDonationRollup.query.delete()
+    DailyReportRollup.query.delete()
+    donation_day = db.func.date(Donation.pickup_time)
+    donation_totals = {}
+    for day, food_type, count, quantity in (db.session.query(donation_day, Donation.food_type,
+                                                             db.func.count(Donation.id), db.func.sum(Donation.quantity))
+                                            .filter(Donation.pickup_time.isnot(None))
+                                            .group_by(donation_day, Donation.food_type)):
+        key = (_as_date(day), normalize_category(food_type))
+        totals = donation_totals.setdefault(key, [0, 0])
+        totals[0] += count
+        totals[1] += _as_int(quantity)
+    db.session.bulk_insert_mappings(DailyDonationRollup, [
+        {'day': day, 'food_type': food_type, 'donation_count': count, 'quantity_sum': quantity}
+        for (day, food_type), (count, quantity) in donation_totals.items()
+    ])
+    report_day = db.func.date(Report.report_time)
+    report_totals = {}
+    for day, animal_type, count in (db.session.query(report_day, Report.animal_type, db.func.count(Report.id))
+                                    .filter(Report.report_time.isnot(None))
+                                    .group_by(report_day, Report.animal_type)):
+        key = (_as_date(day), normalize_category(animal_type))
+        report_totals[key] = report_totals.get(key, 0) + count
+    db.session.bulk_insert_mappings(DailyReportRollup, [
+        {'day': day, 'animal_type': animal_type, 'report_count': count}
+        for (day, animal_type), count in report_totals.items()
+    ])
+    bump_cache_version('donations')
+    bump_cache_version('reports')
+    db.session.commit()
+    return len(donation_totals), len(report_totals)
+
+analytics_cli = AppGroup('analytics', help='Analytics rollup maintenance.')
+
+@analytics_cli.command('rebuild-rollups')
+def rebuild_rollups_command():
+    """Rebuild the daily donation/report rollups and the animal type facet from historical data."""
+    donation_rows, report_rows = rebuild_rollups()
+    facet_rows = rebuild_animal_type_facets()
+    click.echo(f"Rebuilt {donation_rows} donation and {report_rows} report rollup rows, {facet_rows} animal types")
+
+# --- Points ---
+LEADERBOARD_WINDOWS = ('all', 'week', 'month', 'event')
+
+def leaderboard_boards(when, event_id=None):
+    """LeaderboardTotal board keys an award made at `when` counts towards."""
+    day = when.date()
+    boards = [f"week:{day - timedelta(days=day.weekday())}", f"month:{day.replace(day=1)}"]
+    if event_id is not None:
+        boards.append(f"event:{event_id}")
+    return boards
+
+def event_for_award(user_id, when):
+    """Id of the first event the user signed up for that takes place on the day of `when`, if any."""
+    day_start = datetime.combine(when.date(), datetime.min.time())
+    return (db.session.query(Event.id).join(event_participants)
+            .filter(event_participants.c.user_id == user_id,
+                    Event.event_time >= day_start, Event.event_time < day_start + timedelta(days=1))
+            .order_by(Event.event_time, Event.id).limit(1).scalar())
+
+def award_points(user, points, reason, event_id=None):
+    """Append a ledger entry and atomically add `points` to the user's all-time and window totals."""
+    now = datetime.utcnow()
+    if event_id is None:
+        event_id = event_for_award(user.id, now)
+    db.session.add(PointsLedger(user_id=user.id, points=points, reason=reason, event_id=event_id, created_at=now))
+    User.query.filter_by(id=user.id).update({User.points: User.points + points}, synchronize_session=False)
+    for board in leaderboard_boards(now, event_id):
+        upsert_increment(LeaderboardTotal, {'board': board, 'user_id': user.id}, points=points)
+    bump_cache_version('leaderboard')
+    db.session.info.setdefault('rank_awards', []).append((user.id, user.username, points))
+
+def rebuild_leaderboards():
+    """Recompute LeaderboardTotal from the points ledger. Returns the number of rows written."""
+    LeaderboardTotal.query.delete()
+    rows = []
+    for granularity in ('week', 'month'):
+        period = period_bucket(db.func.date(PointsLedger.created_at), granularity)
+        rows += [{'board': f"{granularity}:{_as_date(p)}", 'user_id': user_id, 'points': total}
+                 for p, user_id, total in db.session.query(period, PointsLedger.user_id, db.func.sum(PointsLedger.points))
+                 .group_by(period, PointsLedger.user_id)]
+    rows += [{'board': f"event:{event_id}", 'user_id': user_id, 'points': total}
+             for event_id, user_id, total in db.session.query(PointsLedger.event_id, PointsLedger.user_id,
+                                                             db.func.sum(PointsLedger.points))
+             .filter(PointsLedger.event_id.isnot(None)).group_by(PointsLedger.event_id, PointsLedger.user_id)]
+    db.session.bulk_insert_mappings(LeaderboardTotal, rows)
+    bump_cache_version('leaderboard')
+    db.session.commit()
+    return len(rows)
+
+def leaderboard_query(board):
+    return (db.session.query(User.id, User.username, LeaderboardTotal.points)
+            .join(LeaderboardTotal, LeaderboardTotal.user_id == User.id)
+            .filter(LeaderboardTotal.board == board).order_by(LeaderboardTotal.points.desc()))
+
+def leaderboard_top(window='all', event_id=None, limit=10):
+    """Top `limit` [{'user_id', 'username', 'points'}] for a window."""
+    if window == 'all':
+        return rank_index.top(limit)
+
+    def compute():
+        week_board, month_board = leaderboard_boards(datetime.utcnow())
+        board = {'week': week_board, 'month': month_board}.get(window, f"event:{event_id}")
+        return [{'user_id': user_id, 'username': username, 'points': points}
+                for user_id, username, points in leaderboard_query(board).limit(limit)]
+    # The current week/month is part of the key so a new period never serves the last one's board.
+    return stats_cache.get_or_compute('leaderboard', [window, event_id, limit, datetime.utcnow().date()],
+                                      ['leaderboard'], compute)
+
+@analytics_cli.command('rebuild-leaderboards')
+def rebuild_leaderboards_command():
+    """Rebuild the weekly, monthly and per-event leaderboards from the points ledger."""
+    click.echo(f"Rebuilt {rebuild_leaderboards()} leaderboard rows")
+
+app.cli.add_command(analytics_cli)
+
+# --- Leaderboard Index ---
+class SQLiteRankBackend:
+    """Point totals shared by the worker processes on a host; each write is stamped with a sequence number."""
+
+    def __init__(self, path):
+        self.path = path
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS rank_scores (user_id INTEGER PRIMARY KEY, '
+                         'username TEXT NOT NULL, points INTEGER NOT NULL, seq INTEGER NOT NULL)')
+            conn.execute('CREATE INDEX IF NOT EXISTS ix_rank_scores_seq ON rank_scores (seq)')
+
+    def _write(self, statement, rows):
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            seq = conn.execute('SELECT COALESCE(MAX(seq), 0) + 1 FROM rank_scores').fetchone()[0]
+            conn.executemany(statement, [row + (seq,) for row in rows])
+            conn.execute('COMMIT')
+            return seq
+        finally:
+            conn.close()
+
+    def seed(self, rows):
+        """Fill the shared totals with (user_id, username, points) rows unless another process already has."""
+        conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            if conn.execute('SELECT 1 FROM rank_scores LIMIT 1').fetchone() is None:
+                conn.executemany('INSERT INTO rank_scores (user_id, username, points, seq) VALUES (?, ?, ?, 1)', rows)
+            conn.execute('COMMIT')
+        finally:
+            conn.close()
+
+    def increment(self, user_id, username, delta):
+        self._write('INSERT INTO rank_scores (user_id, username, points, seq) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (user_id) DO UPDATE SET username = excluded.username, '
+                    'points = points + excluded.points, seq = excluded.seq', [(user_id, username, delta)])
+
+    def changes_since(self, seq):
+        """((user_id, username, points), ...) written after `seq`, and the latest sequence seen."""
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            rows = conn.execute('SELECT user_id, username, points, seq FROM rank_scores WHERE seq > ? ORDER BY seq',
+                                (seq,)).fetchall()
+        return [row[:3] for row in rows], (rows[-1][3] if rows else seq)
+
+class RankIndex:
+    """All-time ranking as a sorted list of (-points, user_id), synced from the shared backend if any."""
+
+    def __init__(self, shared=None):
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._keys = []
+        self._points = {}
+        self._names = {}
+        self._seq = 0
+
+    def _set(self, user_id, username, points):
+        old = self._points.get(user_id)
+        if old is not None:
+            del self._keys[bisect.bisect_left(self._keys, (-old, user_id))]
+        bisect.insort(self._keys, (-points, user_id))
+        self._points[user_id] = points
+        self._names[user_id] = username
+
+    def _sync(self):
+        if self.shared is not None:
+            rows, self._seq = self.shared.changes_since(self._seq)
+            for row in rows:
+                self._set(*row)
+
+    def seed(self, rows):
+        """Replace the index with (user_id, username, points) rows."""
+        rows = [(user_id, username, points or 0) for user_id, username, points in rows]
+        with self._lock:
+            if self.shared is not None:
+                # Shared totals already seeded by another worker may include awards newer than `rows`.
+                self.shared.seed(rows)
+                rows, self._seq = self.shared.changes_since(0)
+            self._keys = sorted((-points, user_id) for user_id, _, points in rows)
+            self._points = {user_id: points for user_id, _, points in rows}
+            self._names = {user_id: username for user_id, username, _ in rows}
+
+    def add(self, user_id, username, delta=0):
+        """Add `delta` points to a user (creating the entry if needed) and refresh their username."""
+        with self._lock:
+            self._sync()
+            if self.shared is not None:
+                self.shared.increment(user_id, username, delta)
+            self._set(user_id, username, self._points.get(user_id, 0) + delta)
+
+    def top(self, limit):
+        with self._lock:
+            self._sync()
+            return [{'user_id': user_id, 'username': self._names[user_id], 'points': -points}
+                    for points, user_id in self._keys[:limit]]
+
+    def rank(self, user_id):
+        """1-based position of the user, or None if they are not indexed."""
+        with self._lock:
+            self._sync()
+            points = self._points.get(user_id)
+            if points is None:
+                return None
+            return bisect.bisect_left(self._keys, (-points, user_id)) + 1
+
+rank_index = RankIndex(SQLiteRankBackend(app.config['LEADERBOARD_PATH'])
+                       if app.config['LEADERBOARD_BACKEND'] == 'sqlite' else None)
+
+@db.event.listens_for(db.session, 'after_commit')
+def apply_rank_awards(session):
+    for user_id, username, points in session.info.pop('rank_awards', []):
+        rank_index.add(user_id, username, points)
+
+@db.event.listens_for(db.session, 'after_soft_rollback')
+def discard_rank_awards(session, previous_transaction):
+    # Savepoints and failed flushes roll back inner transactions (e.g. upsert_increment's conflict
+    # fallback); only the outermost rollback drops the awards.
+    if previous_transaction.parent is None:
+        session.info.pop('rank_awards', None)
+
+# --- Response Cache ---
+def bump_cache_version(tag):
+    """Invalidate every cached payload tagged `tag`."""
+    upsert_increment(CacheVersion, {'tag': tag}, version=1)
+
+def cache_versions(tags):
+    versions = dict(db.session.query(CacheVersion.tag, CacheVersion.version).filter(CacheVersion.tag.in_(tags)))
+    return [versions.get(tag, 0) for tag in tags]
+
+class TTLCache:
+    """Bounded LRU of computed values, each living `ttl_seconds` (forever when None)."""
+
+    def __init__(self, max_entries, ttl_seconds=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _hit(self, key):
+        hit = self._entries.get(key)
+        if hit is None:
+            return None
+        if hit[0] is not None and hit[0] <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return hit
+
+    def get(self, key):
+        with self._lock:
+            hit = self._hit(key)
+        return hit[1] if hit else None
+
+    def set(self, key, value):
+        expires_at = None if self.ttl_seconds is None else time.time() + self.ttl_seconds
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        with self._lock:
+            hit = self._hit(key)
+        if hit:
+            return hit[1]
+        value = compute()
+        self.set(key, value)
+        return value
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+class SQLiteCacheBackend:
+    """JSON payloads in a SQLite file shared by all worker processes on a host."""
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS cache_entries '
+                         '(key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL)')
+
+    def get(self, key):
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            row = conn.execute('SELECT value FROM cache_entries WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value):
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('INSERT OR REPLACE INTO cache_entries (key, value, stored_at) VALUES (?, ?, ?)',
+                         (key, json.dumps(value), time.time()))
+            conn.execute('DELETE FROM cache_entries WHERE key NOT IN '
+                         '(SELECT key FROM cache_entries ORDER BY stored_at DESC LIMIT ?)', (self.max_entries,))
+
+class VersionedCache:
+    """Payload cache keyed on the current version of each dependency tag."""
+
+    def __init__(self, local, shared=None):
+        self.local = local
+        self.shared = shared
+
+    def get_or_compute(self, name, params, tags, compute):
+        key = json.dumps([name, params, cache_versions(tags)], default=str)
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        if self.shared is not None:
+            value = self.shared.get(key)
+            if value is not None:
+                self.local.set(key, value)
+                return value
+        value = compute()
+        self.local.set(key, value)
+        if self.shared is not None:
+            self.shared.set(key, value)
+        return value
+
+stats_cache = VersionedCache(
+    TTLCache(app.config['STATS_CACHE_MAX_ENTRIES']),
+    SQLiteCacheBackend(app.config['STATS_CACHE_PATH'], app.config['STATS_CACHE_MAX_ENTRIES'])
+    if app.config['STATS_CACHE_BACKEND'] == 'sqlite' else None,
+)
+
+# --- Query Budgets ---
+@db.event.listens_for(Engine, 'before_cursor_execute')
+def count_request_queries(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        g.query_count = g.get('query_count', 0) + 1
+
+class QueryBudgetExceeded(RuntimeError):
+    pass
+
+def query_budget(limit):
+    """Cap the SQL statements a view may issue; over budget raises QueryBudgetExceeded when enforced."""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            start = g.get('query_count', 0)
+            response = view(*args, **kwargs)
+            used = g.get('query_count', 0) - start
+            if used > limit:
+                message = f"{request.endpoint} issued {used} queries (budget {limit})"
+                if app.config.get('TESTING') or app.config['QUERY_BUDGET_ENFORCE']:
+                    raise QueryBudgetExceeded(message)
+                app.logger.warning(message)
+            return response
+        return wrapper
+    return decorator
+
+def hot_queries():
+    """(label, query) for the statements behind the busiest routes, with representative filters."""
+    now = datetime.utcnow()
+    return [
+        ('weekly leaderboard', leaderboard_query(leaderboard_boards(now)[0]).limit(10)),
+        ('feedback', Feedback.query.order_by(Feedback.submitted_at.desc()).limit(10)),
+        ('events', Event.query.order_by(Event.event_time)),
+        ('reports page', Report.query.filter(Report.report_time.isnot(None), db.or_(
+            Report.report_time < now, db.and_(Report.report_time == now, Report.id < 1)))
+            .order_by(Report.report_time.desc(), Report.id.desc()).limit(51)),
+        ('donations page', Donation.query.filter(Donation.pickup_time.isnot(None), db.or_(
+            Donation.pickup_time < now, db.and_(Donation.pickup_time == now, Donation.id < 1)))
+            .order_by(Donation.pickup_time.desc(), Donation.id.desc()).limit(51)),
+        ('report map viewport', within_bbox(Report, Report.latitude, Report.longitude, Report.geohash,
+                                            (77.55, 12.90, 77.65, 13.00))),
+        ('report map filter', within_bbox(Report, Report.latitude, Report.longitude, Report.geohash,
+                                          (77.55, 12.90, 77.65, 13.00))
+            .filter(MAP_LAYERS['reports']['filter']('Dog'))),
+        ('heatmap', heatmap_cache._query('', 7, 0)),
+        ('heatmap filter', heatmap_cache._query('dog', 7, 0)),
+        ('stats range', DailyReportRollup.query.filter(DailyReportRollup.day >= now.date())),
+    ]
+
+def explain_query_plan(query):
+    """SQLite EXPLAIN QUERY PLAN detail lines for an ORM query."""
+    compiled = query.statement.compile(dialect=db.engine.dialect)
+    params = compiled.construct_params()
+    positional = tuple(params[name] for name in compiled.positiontup)
+    rows = db.session.connection().exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}', positional).all()
+    return [row[-1] for row in rows]
+
+def full_table_scans(plan):
+    return [step for step in plan if step.startswith('SCAN') and 'INDEX' not in step]
+
+@app.cli.command('check-query-plans')
+def check_query_plans_command():
+    """Fail if any hot route's query plan falls back to a full table scan (SQLite only)."""
+    if db.engine.dialect.name != 'sqlite':
+        click.echo('Query plan check only supports SQLite; skipping.')
+        return
+    failures = 0
+    for label, query in hot_queries():
+        plan = explain_query_plan(query)
+        scans = full_table_scans(plan)
+        failures += bool(scans)
+        click.echo(f"{'FULL SCAN' if scans else 'ok':9} {label}: {'; '.join(plan)}")
+    if failures:
+        raise SystemExit(1)
+
+# --- Bengaluru Gazetteer ---
+# name (aliases separated by '|'), kind, latitude, longitude, pin code
+BENGALURU_GAZETTEER = [
+    ("koramangala", "locality", 12.9352, 77.6245, "560034"),
+    ("indiranagar|indira nagar", "locality", 12.9719, 77.6412, "560038"),
+    ("jayanagar", "locality", 12.9250, 77.5938, "560041"),
+    ("jp nagar|j p nagar|jayaprakash nagar", "locality", 12.9063, 77.5857, "560078"),
+    ("whitefield", "locality", 12.9698, 77.7500, "560066"),
+    ("malleshwaram|malleswaram", "locality", 13.0031, 77.5643, "560003"),
+    ("rajajinagar", "locality", 12.9910, 77.5525, "560010"),
+    ("basavanagudi", "locality", 12.9422, 77.5738, "560004"),
+    ("hsr layout|hsr", "locality", 12.9116, 77.6474, "560102"),
+    ("btm layout|btm", "locality", 12.9166, 77.6101, "560076"),
+    ("electronic city|electronics city", "locality", 12.8452, 77.6602, "560100"),
+    ("marathahalli", "locality", 12.9569, 77.7011, "560037"),
+    ("hebbal", "locality", 13.0358, 77.5970, "560024"),
+    ("yelahanka", "locality", 13.1007, 77.5963, "560064"),
+    ("banashankari", "locality", 12.9255, 77.5468, "560050"),
+    ("bellandur", "locality", 12.9304, 77.6784, "560103"),
+    ("frazer town|fraser town|pulikeshi nagar", "locality", 12.9980, 77.6140, "560005"),
+    ("shivajinagar", "locality", 12.9857, 77.6057, "560051"),
+    ("mg road|mahatma gandhi road", "locality", 12.9756, 77.6066, "560001"),
+    ("brigade road", "locality", 12.9719, 77.6070, "560025"),
+    ("ulsoor|halasuru", "locality", 12.9817, 77.6286, "560008"),
+    ("rt nagar|r t nagar", "locality", 13.0213, 77.5950, "560032"),
+    ("sadashivanagar", "locality", 13.0068, 77.5813, "560080"),
+    ("vijayanagar", "locality", 12.9719, 77.5350, "560040"),
+    ("yeshwanthpur|yeshwantpur", "locality", 13.0280, 77.5409, "560022"),
+    ("kengeri", "locality", 12.9081, 77.4826, "560060"),
+    ("banaswadi", "locality", 13.0104, 77.6482, "560043"),
+    ("kr puram|k r puram|krishnarajapuram", "locality", 13.0080, 77.6950, "560036"),
+    ("domlur", "locality", 12.9609, 77.6387, "560071"),
+    ("jalahalli", "locality", 13.0465, 77.5483, "560013"),
+    ("peenya", "locality", 13.0285, 77.5197, "560058"),
+    ("bommanahalli", "locality", 12.9030, 77.6240, "560068"),
+    ("hennur", "locality", 13.0358, 77.6434, "560043"),
+    ("kammanahalli", "locality", 13.0159, 77.6379, "560084"),
+    ("richmond town", "locality", 12.9634, 77.6000, "560025"),
+    ("wilson garden", "locality", 12.9489, 77.5968, "560027"),
+    ("chamrajpet|chamarajpet", "locality", 12.9600, 77.5640, "560018"),
+    ("majestic|gandhinagar", "locality", 12.9767, 77.5713, "560009"),
+    ("nagarbhavi", "locality", 12.9600, 77.5100, "560072"),
+    ("rr nagar|rajarajeshwari nagar", "locality", 12.9274, 77.5155, "560098"),
+    ("uttarahalli", "locality", 12.9050, 77.5450, "560061"),
+    ("vasanth nagar", "locality", 12.9900, 77.5930, "560052"),
+    ("cox town", "locality", 12.9950, 77.6190, "560005"),
+    ("mahadevapura", "locality", 12.9916, 77.6940, "560048"),
+    ("kadugodi", "locality", 12.9980, 77.7610, "560067"),
+    ("hoodi", "locality", 12.9918, 77.7166, "560048"),
+    ("brookefield", "locality", 12.9667, 77.7167, "560037"),
+    ("cv raman nagar|c v raman nagar", "locality", 12.9857, 77.6630, "560093"),
+    ("jeevan bima nagar|jb nagar", "locality", 12.9667, 77.6570, "560075"),
+    ("vidyaranyapura", "locality", 13.0776, 77.5583, "560097"),
+    ("sahakar nagar", "locality", 13.0620, 77.5870, "560092"),
+    ("thanisandra", "locality", 13.0580, 77.6330, "560077"),
+    ("hulimavu", "locality", 12.8787, 77.6040, "560076"),
+    ("begur", "locality", 12.8780, 77.6370, "560068"),
+    ("arekere", "locality", 12.8860, 77.5990, "560076"),
+    ("madiwala", "locality", 12.9226, 77.6174, "560068"),
+    ("ejipura", "locality", 12.9400, 77.6290, "560047"),
+    ("shanthinagar|shantinagar", "locality", 12.9565, 77.5990, "560027"),
+    ("seshadripuram", "locality", 12.9890, 77.5730, "560020"),
+    ("basaveshwaranagar", "locality", 12.9930, 77.5390, "560079"),
+    ("mathikere", "locality", 13.0330, 77.5610, "560054"),
+    ("girinagar", "locality", 12.9420, 77.5400, "560085"),
+    ("padmanabhanagar", "locality", 12.9160, 77.5540, "560070"),
+    ("kumaraswamy layout", "locality", 12.9080, 77.5620, "560078"),
+    ("bagalagunte", "ward", 13.0536, 77.5019, None),
+    ("hagadur", "ward", 12.9870, 77.7470, None),
+    ("agaram", "ward", 12.9540, 77.6270, None),
+    ("vannarpet", "ward", 12.9520, 77.6180, None),
+    ("lakkasandra", "ward", 12.9430, 77.6060, None),
+    ("sudhama nagar", "ward", 12.9550, 77.5880, None),
+    ("dharmaraya swamy temple ward", "ward", 12.9640, 77.5770, None),
+    ("kempegowda international airport|bangalore airport|bengaluru airport", "landmark", 13.1986, 77.7066, "560300"),
+    ("cubbon park", "landmark", 12.9763, 77.5929, None),
+    ("lalbagh|lal bagh", "landmark", 12.9507, 77.5848, None),
+    ("vidhana soudha", "landmark", 12.9796, 77.5906, None),
+    ("bangalore palace|bengaluru palace", "landmark", 12.9987, 77.5920, None),
+    ("iskcon temple", "landmark", 13.0098, 77.5511, None),
+    ("bull temple|dodda basavana gudi", "landmark", 12.9425, 77.5680, None),
+    ("ulsoor lake|halasuru lake", "landmark", 12.9830, 77.6200, None),
+    ("sankey tank", "landmark", 13.0096, 77.5727, None),
+    ("bannerghatta national park", "landmark", 12.8000, 77.5770, "560083"),
+    ("kempegowda bus station|majestic bus stand", "landmark", 12.9767, 77.5713, None),
+    ("ksr bengaluru city railway station|city railway station", "landmark", 12.9781, 77.5697, None),
+    ("forum mall", "landmark", 12.9346, 77.6113, None),
+    ("chinnaswamy stadium", "landmark", 12.9788, 77.5996, None),
+]
+
+# Landmarks are more specific than wards, which are more specific than localities.
+_GAZETTEER_KIND_RANK = {"landmark": 3, "ward": 2, "locality": 1}
+_PINCODE_RE = re.compile(r'\b(56\d{4})\b')
+# An address must name the city or carry a Bengaluru PIN before prefix/fuzzy matches are tried.
+_GAZETTEER_CITY_NAMES = {"bengaluru", "bangalore", "blr"}
+_BENGALURU_PINCODE_RE = re.compile(r'\b(560\d{3})\b')
+# Address filler that must never be fuzzy-matched on its own.
+_GAZETTEER_STOPWORDS = {
+    "bengaluru", "bangalore", "karnataka", "india", "road", "rd", "main", "cross", "street", "st",
+    "layout", "nagar", "block", "stage", "phase", "sector", "town", "city", "temple", "lake",
+    "park", "station", "near", "opp", "opposite", "behind", "next", "to", "the", "of",
+}
+
+def _trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class GazetteerIndex:
+    """Exact and PIN code lookups over the bundled gazetteer, plus prefix/trigram approximations."""
+
+    def __init__(self, rows):
+        self.entries = []
+        self.by_name = {}
+        self.by_pincode = {}
+        self.trigram_index = {}
+        for names, kind, lat, lng, pincode in rows:
+            entry = (kind, lat, lng)
+            for name in names.split('|'):
+                idx = len(self.entries)
+                self.entries.append((name, entry))
+                self.by_name[name] = entry
+                for gram in _trigrams(name):
+                    self.trigram_index.setdefault(gram, set()).add(idx)
+            if pincode and kind == "locality":
+                self.by_pincode.setdefault(pincode, entry)
+        self.sorted_names = sorted(self.by_name)
+
+    def _prefix(self, text):
+        i = bisect.bisect_left(self.sorted_names, text)
+        matches = []
+        while i < len(self.sorted_names) and self.sorted_names[i].startswith(text):
+            matches.append(self.sorted_names[i])
+            i += 1
+        return matches[0] if len(matches) == 1 else None
+
+    def _fuzzy(self, text, threshold=0.5):
+        grams = _trigrams(text)
+        counts = {}
+        for gram in grams:
+            for idx in self.trigram_index.get(gram, ()):
+                counts[idx] = counts.get(idx, 0) + 1
+        best, best_score = None, threshold
+        for idx, shared in counts.items():
+            name, entry = self.entries[idx]
+            score = shared / (len(grams) + len(_trigrams(name)) - shared)
+            if score >= best_score:
+                best, best_score = entry, score
+        return best
+
+    def lookup(self, address):
+        """Return (lat, lng) for the most specific place named in the address, or None."""
+        text = normalize_address(address)
+        if not text:
+            return None
+        tokens = text.split()
+        windows = [' '.join(tokens[i:i + n]) for n in range(4, 0, -1) for i in range(len(tokens) - n + 1)]
+        exact = [self.by_name[w] for w in windows if w in self.by_name]
+        if exact:
+            kind, lat, lng = max(exact, key=lambda e: _GAZETTEER_KIND_RANK[e[0]])
+            return lat, lng
+        pin = _PINCODE_RE.search(address)
+        if pin and pin.group(1) in self.by_pincode:
+            _, lat, lng = self.by_pincode[pin.group(1)]
+            return lat, lng
+        return None
+
+    def approximate(self, address):
+        """Best prefix or trigram match, only for addresses that name Bengaluru."""
+        text = normalize_address(address)
+        tokens = text.split()
+        if not (_GAZETTEER_CITY_NAMES.intersection(tokens) or _BENGALURU_PINCODE_RE.search(address)):
+            return None
+        windows = [' '.join(tokens[i:i + n]) for n in range(4, 0, -1) for i in range(len(tokens) - n + 1)]
+        for window in windows:
+            if len(window) < 4 or all(t in _GAZETTEER_STOPWORDS or t.isdigit() for t in window.split()):
+                continue
+            name = self._prefix(window)
+            entry = self.by_name[name] if name else self._fuzzy(window)
+            if entry:
+                return entry[1], entry[2]
+        return None
+
+# --- Rate Limiting ---
+class TokenBucket:
+    """Token bucket persisted in SQLite so every thread and process shares one budget."""
+
+    def __init__(self, path, name, rate, capacity):
+        self.path = path
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self._lock = threading.Lock()
+        with sqlite3.connect(self.path, timeout=10) as conn:
+            conn.execute('CREATE TABLE IF NOT EXISTS token_bucket '
+                         '(name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)')
+
+    def try_acquire(self):
+        """Take a token if one is available. Returns 0.0 on success, else seconds to wait."""
+        with self._lock:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            try:
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('SELECT tokens, updated_at FROM token_bucket WHERE name = ?',
+                                   (self.name,)).fetchone()
+                now = time.time()
+                if row is None:
+                    tokens = self.capacity
+                else:
+                    tokens = min(self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+                if tokens >= 1:
+                    tokens -= 1
+                    wait = 0.0
+                else:
+                    wait = (1 - tokens) / self.rate
+                conn.execute('INSERT OR REPLACE INTO token_bucket (name, tokens, updated_at) VALUES (?, ?, ?)',
+                             (self.name, tokens, now))
+                conn.execute('COMMIT')
+                return wait
+            finally:
+                conn.close()
+
+    def acquire(self, timeout=None):
+        """Wait cooperatively (socketio.sleep) for a token. Returns False on timeout."""
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            wait = self.try_acquire()
+            if wait == 0.0:
+                return True
+            if deadline is not None and time.time() + wait > deadline:
+                return False
+            socketio.sleep(wait)
+
+class GeocodePending(Exception):
+    """A remote provider's rate limit is exhausted; retry after `retry_after` seconds."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"geocoding rate limited, retry in {retry_after:.2f}s")
+        self.retry_after = retry_after
+
+# --- Spatial Indexing ---
+# Geohash cells are stored on rows with coordinates; because a geohash prefix is a
+# rectangle, a viewport becomes a few index range scans instead of a table scan.
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+
+def geohash_encode(lat, lng, precision=12):
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, bit_count, even = [], 0, 0, True
+    while len(chars) < precision:
+        rng, value = (lng_range, lng) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            rng[0] = mid
+        else:
+            bits <<= 1
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+def geohash_cell_size(precision):
+    """(lat degrees, lng degrees) spanned by a geohash cell of this length."""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+def geohash_cover(south, west, north, east, max_cells=24, max_precision=8):
+    """Geohash prefixes that together cover the box, using the finest precision within max_cells."""
+    for precision in range(max_precision, 0, -1):
+        lat_step, lng_step = geohash_cell_size(precision)
+        rows = int((north - south) / lat_step) + 2
+        cols = int((east - west) / lng_step) + 2
+        if rows * cols > max_cells and precision > 1:
+            continue
+        cells = set()
+        for i in range(rows):
+            lat = min(south + i * lat_step, north)
+            for j in range(cols):
+                lng = min(west + j * lng_step, east)
+                cells.add(geohash_encode(lat, lng, precision))
+        return sorted(cells)
+
+def parse_bbox(value):
+    """Parse 'west,south,east,north' into floats, or raise ValueError."""
+    west, south, east, north = (float(v) for v in value.split(','))
+    if not (-90 <= south <= north <= 90 and -180 <= west <= east <= 180):
+        raise ValueError('bbox must be west,south,east,north with south <= north and west <= east')
+    return west, south, east, north
+
+def within_bbox(model, lat_col, lng_col, geohash_col, bbox):
+    """Query filter for rows inside bbox: geohash prefix ranges, then an exact coordinate check."""
+    west, south, east, north = bbox
+    prefixes = geohash_cover(south, west, north, east)
+    ranges = [db.and_(geohash_col >= prefix, geohash_col < prefix + '~') for prefix in prefixes]
+    return model.query.filter(db.or_(*ranges), lat_col.between(south, north), lng_col.between(west, east))
+
+def cluster_precision(zoom):
+    """Geohash length whose cells are roughly a quarter of a 256px map tile at this zoom."""
+    target = 360.0 / 2 ** zoom / 4
+    for precision in range(1, 9):
+        if geohash_cell_size(precision)[1] <= target:
+            return precision
+    return 8
+
+map_tile_cache = TTLCache(app.config['MAP_TILE_CACHE_SIZE'], app.config['MAP_TILE_CACHE_SECONDS'])
+
+class HeatmapCache:
+    """Report density grids per (animal type, time window), topped up by report id between rebuilds."""
+
+    def __init__(self, bounds, cell_degrees, rebuild_seconds, max_grids):
+        south, west, north, east = bounds
+        self.lat_edges = np.arange(south, north + cell_degrees / 2, cell_degrees)
+        self.lng_edges = np.arange(west, east + cell_degrees / 2, cell_degrees)
+        self._grids = TTLCache(max_grids, rebuild_seconds)
+        self._lock = threading.Lock()
+
+    def _bin(self, rows):
+        if not rows:
+            return np.zeros((len(self.lat_edges) - 1, len(self.lng_edges) - 1))
+        coords = np.asarray(rows, dtype=float)
+        grid, _, _ = np.histogram2d(coords[:, 0], coords[:, 1], bins=[self.lat_edges, self.lng_edges])
+        return grid
+
+    def _query(self, animal_type, days, after_id):
+        query = db.session.query(Report.latitude, Report.longitude).filter(
+            Report.id > after_id, Report.latitude.isnot(None), Report.longitude.isnot(None))
+        if animal_type:
+            query = query.filter(Report.animal_type_key == animal_type)
+        if days:
+            query = query.filter(Report.report_time >= datetime.utcnow() - timedelta(days=days))
+        return query
+
+    def grid(self, animal_type='', days=None):
+        """A copy of the grid for a normalized animal type ('' for all) and window."""
+        key = (animal_type, days)
+        entry = self._grids.get(key)
+        if entry is None:
+            max_id = db.session.query(db.func.max(Report.id)).scalar() or 0
+            rows = self._query(animal_type, days, 0).filter(Report.id <= max_id).all()
+            entry = {'grid': self._bin(rows), 'last_id': max_id}
+            with self._lock:
+                self._grids.set(key, entry)
+                return entry['grid'].copy()
+        new_rows = (self._query(animal_type, days, entry['last_id'])
+                    .add_columns(Report.id).order_by(Report.id).all())
+        with self._lock:
+            # Another request may have applied some of these rows while this one queried.
+            new_rows = [row for row in new_rows if row[2] > entry['last_id']]
+            if new_rows:
+                entry['grid'] += self._bin([(lat, lng) for lat, lng, _ in new_rows])
+                entry['last_id'] = new_rows[-1][2]
+            return entry['grid'].copy()
+
+    def points(self, animal_type='', days=None):
+        """Non-empty cells as [cell-centre lat, cell-centre lng, count] triples."""
+        grid = self.grid(animal_type, days)
+        rows, cols = np.nonzero(grid)
+        lat_centres = (self.lat_edges[:-1] + self.lat_edges[1:]) / 2
+        lng_centres = (self.lng_edges[:-1] + self.lng_edges[1:]) / 2
+        return np.column_stack((lat_centres[rows], lng_centres[cols], grid[rows, cols])).tolist()
+
+heatmap_cache = HeatmapCache(app.config['HEATMAP_BOUNDS'], app.config['HEATMAP_CELL_DEGREES'],
+                             app.config['HEATMAP_REBUILD_SECONDS'], app.config['HEATMAP_MAX_GRIDS'])
+
+# --- Geocoding ---
+class GeocodingProvider:
+    """Base geocoder: `geocode(address)` returns (lat, lng) or None."""
+    name = 'base'
+    # Network providers are subject to the upstream rate limit; local ones are not.
+    remote = True
+
+    def geocode(self, address):
+        raise NotImplementedError
+
+    def approximate(self, address):
+        return None
+
+class NominatimProvider(GeocodingProvider):
+    name = 'nominatim'
+    remote = True
+
+    def __init__(self, client):
+        self.client = client
+
+    def geocode(self, address):
+        location_obj = self.client.geocode(address)
+        if location_obj:
+            return location_obj.latitude, location_obj.longitude
+        return None
+
+class GazetteerProvider(GeocodingProvider):
+    name = 'gazetteer'
+    remote = False
+
+    def __init__(self, index):
+        self.index = index
+
+    def geocode(self, address):
+        return self.index.lookup(address)
+
+    def approximate(self, address):
+        return self.index.approximate(address)
+
+GEOCODING_PROVIDERS = {
+    'nominatim': lambda: NominatimProvider(geolocator),
+    'gazetteer': lambda: GazetteerProvider(GazetteerIndex(BENGALURU_GAZETTEER)),
+}
+
+def _build_providers():
+    names = [n.strip() for n in app.config['GEOCODE_PROVIDERS'].split(',') if n.strip()]
+    return [GEOCODING_PROVIDERS[n]() for n in names]
+
+geocoding_providers = _build_providers()
+geocode_rate_limiters = {
+    provider.name: TokenBucket(app.config['RATE_LIMIT_DB_PATH'], provider.name,
+                               app.config['GEOCODE_RATE_PER_SECOND'], app.config['GEOCODE_RATE_BURST'])
+    for provider in geocoding_providers if provider.remote
+}
+
+# Model, address column, latitude column and longitude column for each kind of geocoded row.
+GEOCODE_TARGETS = {
+    'report': (Report, 'location', 'latitude', 'longitude'),
+    'donation': (Donation, 'pickup_location', 'pickup_latitude', 'pickup_longitude'),
+}
+# Geohash column kept in step with the coordinates, for targets with a spatial index.
+GEOHASH_ATTRS = {'report': 'geohash', 'donation': 'pickup_geohash'}
+
+def coordinate_values(target_type, lat, lng):
+    """Column values to write when a row of `target_type` gets coordinates."""
+    _, _, lat_attr, lng_attr = GEOCODE_TARGETS[target_type]
+    values = {lat_attr: lat, lng_attr: lng}
+    if target_type in GEOHASH_ATTRS:
+        values[GEOHASH_ATTRS[target_type]] = geohash_encode(lat, lng)
+    return values
+
+# --- Full-Text Search ---
+# Reports are indexed with an external-content FTS5 table on SQLite, kept in sync by
+# triggers, and with GIN expression indexes on Postgres. Both stay current on every
+# insert, update and delete regardless of which code path writes the row.
+REPORT_TSVECTOR_SQL = ("to_tsvector('simple', coalesce(animal_type, '') || ' ' || "
+                       "coalesce(description, '') || ' ' || coalesce(location, ''))")
+REPORT_SEARCH_DDL = {
+    'sqlite': [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS report_fts USING fts5(animal_type, description, location, "
+        "content='report', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        "CREATE TRIGGER IF NOT EXISTS report_fts_ai AFTER INSERT ON report BEGIN "
+        "INSERT INTO report_fts(rowid, animal_type, description, location) "
+        "VALUES (new.id, new.animal_type, new.description, new.location); END",
+        "CREATE TRIGGER IF NOT EXISTS report_fts_ad AFTER DELETE ON report BEGIN "
+        "INSERT INTO report_fts(report_fts, rowid, animal_type, description, location) "
+        "VALUES ('delete', old.id, old.animal_type, old.description, old.location); END",
+        "CREATE TRIGGER IF NOT EXISTS report_fts_au AFTER UPDATE OF animal_type, description, location ON report BEGIN "
+        "INSERT INTO report_fts(report_fts, rowid, animal_type, description, location) "
+        "VALUES ('delete', old.id, old.animal_type, old.description, old.location); "
+        "INSERT INTO report_fts(rowid, animal_type, description, location) "
+        "VALUES (new.id, new.animal_type, new.description, new.location); END",
+    ],
+    'postgresql': [
+        f"CREATE INDEX IF NOT EXISTS ix_report_fts ON report USING GIN ({REPORT_TSVECTOR_SQL})",
+    ],
+}
+
+def ensure_report_search_index():
+    """Create the report search index for the active backend, backfilling it on first creation."""
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as conn:
+        existed = dialect == 'sqlite' and conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE name = 'report_fts'").first() is not None
+        for statement in REPORT_SEARCH_DDL.get(dialect, []):
+            conn.exec_driver_sql(statement)
+        if dialect == 'sqlite' and not existed:
+            conn.exec_driver_sql("INSERT INTO report_fts(report_fts) VALUES ('rebuild')")
+
+def search_terms(text):
+    return re.findall(r'\w+', (text or '').lower())
+
+def search_reports(text, page, per_page):
+    """Best-ranked reports matching `text`. Returns ([(report, rank)], has_more)."""
+    terms = search_terms(text)
+    if not terms:
+        return [], False
+    params = {'limit': per_page + 1, 'offset': (page - 1) * per_page}
+    if db.engine.dialect.name == 'sqlite':
+        params['fts_query'] = ' '.join(f'"{term}"*' for term in terms)
+        rows = db.session.execute(db.text(
+            "SELECT rowid, bm25(report_fts) AS rank FROM report_fts WHERE report_fts MATCH :fts_query "
+            "ORDER BY rank LIMIT :limit OFFSET :offset"), params).all()
+        rows = [(row_id, -rank) for row_id, rank in rows]
+    else:
+        params['fts_query'] = ' & '.join(f'{term}:*' for term in terms)
+        rows = db.session.execute(db.text(
+            f"SELECT id, ts_rank({REPORT_TSVECTOR_SQL}, query) AS rank "
+            f"FROM report, to_tsquery('simple', :fts_query) query WHERE {REPORT_TSVECTOR_SQL} @@ query "
+            f"ORDER BY rank DESC LIMIT :limit OFFSET :offset"), params).all()
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    reports_by_id = {r.id: r for r in Report.query.filter(Report.id.in_([row_id for row_id, _ in rows]))}
+    return [(reports_by_id[row_id], rank) for row_id, rank in rows if row_id in reports_by_id], has_more
+
+# --- Map Layers ---
+# Columns behind each map's GeoJSON endpoint; `category` feeds the cluster breakdown
+# and `filter` builds the WHERE clause for the optional category filter.
+MAP_LAYERS = {
+    'reports': {'model': Report, 'lat': Report.latitude, 'lng': Report.longitude,
+                'geohash': Report.geohash, 'category': Report.animal_type_key,
+                'filter': lambda value: Report.animal_type_key == normalize_category(value)},
+    'donations': {'model': Donation, 'lat': Donation.pickup_latitude, 'lng': Donation.pickup_longitude,
+                  'geohash': Donation.pickup_geohash, 'category': Donation.food_type,
+                  'filter': lambda value: Donation.food_type.ilike(f'%{value}%')},
+}
+
+def compute_cluster_tile(layer_name, prefix, precision, category_filter):
+    """Aggregate one geohash tile into clusters of `precision`-length cells."""
+    layer = MAP_LAYERS[layer_name]
+    cell = db.func.substr(layer['geohash'], 1, precision)
+    query = (db.session.query(cell, layer['category'], db.func.count(),
+                              db.func.avg(layer['lat']), db.func.avg(layer['lng']))
+             .filter(layer['geohash'] >= prefix, layer['geohash'] < prefix + '~'))
+    if category_filter:
+        query = query.filter(layer['filter'](category_filter))
+    clusters = {}
+    for cell_hash, category, count, avg_lat, avg_lng in query.group_by(cell, layer['category']).all():
+        cluster = clusters.setdefault(cell_hash, {'count': 0, 'lat': 0.0, 'lng': 0.0, 'breakdown': {}})
+        cluster['lat'] += avg_lat * count
+        cluster['lng'] += avg_lng * count
+        cluster['count'] += count
+        label = category or 'Unknown'
+        cluster['breakdown'][label] = cluster['breakdown'].get(label, 0) + count
+    return [{'lat': c['lat'] / c['count'], 'lng': c['lng'] / c['count'],
+             'count': c['count'], 'breakdown': c['breakdown']} for c in clusters.values()]
+
+def cluster_features(layer_name, bbox, zoom, category_filter):
+    """Cluster features for the viewport, read tile by tile through map_tile_cache."""
+    precision = cluster_precision(zoom)
+    west, south, east, north = bbox
+    prefixes = geohash_cover(south, west, north, east, max_precision=precision)
+    features = []
+    for prefix in prefixes:
+        key = (layer_name, category_filter.lower(), precision, prefix)
+        tile = map_tile_cache.get_or_compute(
+            key, lambda prefix=prefix: compute_cluster_tile(layer_name, prefix, precision, category_filter))
+        for cluster in tile:
+            features.append({
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [cluster['lng'], cluster['lat']]},
+                'properties': {'cluster': True, 'count': cluster['count'], 'breakdown': cluster['breakdown']},
+            })
+    return features
+
+def layer_geojson(layer_name, feature_properties):
+    """Shared body of the map GeoJSON endpoints: clusters when zoomed out, else markers."""
+    try:
+        bbox = parse_bbox(request.args.get('bbox', ''))
+        zoom = int(request.args.get('zoom', app.config['MAP_CLUSTER_MAX_ZOOM']))
+    except ValueError:
+        return jsonify({'error': 'bbox must be west,south,east,north and zoom an integer'}), 400
+    category_filter = request.args.get('category', '')
+    if zoom < app.config['MAP_CLUSTER_MAX_ZOOM']:
+        return jsonify({'type': 'FeatureCollection', 'features': cluster_features(layer_name, bbox, zoom, category_filter)})
+    layer = MAP_LAYERS[layer_name]
+    query = within_bbox(layer['model'], layer['lat'], layer['lng'], layer['geohash'], bbox)
+    if category_filter:
+        query = query.filter(layer['filter'](category_filter))
+    rows = query.order_by(layer['model'].id.desc()).limit(app.config['MAP_MAX_FEATURES']).all()
+    features = [{
+        'type': 'Feature',
+        'geometry': {'type': 'Point', 'coordinates': [getattr(row, layer['lng'].key), getattr(row, layer['lat'].key)]},
+        'properties': feature_properties(row),
+    } for row in rows]
+    return jsonify({'type': 'FeatureCollection', 'features': features})
+
+def normalize_address(address):
+    """Canonical cache key: lowercase, punctuation folded to spaces, whitespace collapsed."""
+    cleaned = ''.join(ch if ch.isalnum() else ' ' for ch in address.lower())
+    return ' '.join(cleaned.split())[:200]
+
+def lookup_geocode_cache(address):
+    """Return the fresh cache entry for an address, or None on a miss or expired entry."""
+    key = normalize_address(address)
+    if not key:
+        return None
+    entry = GeocodeCache.query.filter_by(normalized_address=key).first()
+    if entry is None or entry.is_expired():
+        return None
+    return entry
+
+def store_geocode_cache(address, coords, provider):
+    key = normalize_address(address)
+    if not key:
+        return
+    latitude, longitude = coords if coords else (None, None)
+    upsert(GeocodeCache, {'normalized_address': key},
+           {'latitude': latitude, 'longitude': longitude, 'is_negative': coords is None,
+            'provider': provider, 'updated_at': datetime.utcnow()})
+
+def enqueue_geocode(target_type, target):
+    """Fill coordinates from the cache or a local provider, else queue the address."""
+    db.session.flush()
+    address_attr = GEOCODE_TARGETS[target_type][1]
+    address = getattr(target, address_attr)
+    if not address:
+        return None
+    coords = geocode_address(address, remote=False)
+    if coords is not None:
+        for attr, value in coordinate_values(target_type, *coords).items():
+            setattr(target, attr, value)
+        return None
+    job = GeocodeJob(target_type=target_type, target_id=target.id, address=address)
+    db.session.add(job)
+    return job
+
+def resolve_with_providers(address, remote=True, wait=True):
+    """Try each provider in order without touching the database. Returns (coords, provider_name)."""
+    for provider in geocoding_providers:
+        if provider.remote:
+            if not remote:
+                continue
+            limiter = geocode_rate_limiters[provider.name]
+            if wait:
+                limiter.acquire()
+            else:
+                retry_after = limiter.try_acquire()
+                if retry_after:
+                    raise GeocodePending(retry_after)
+        coords = provider.geocode(address)
+        if coords is not None:
+            return coords, provider.name
+    if remote:
+        for provider in geocoding_providers:
+            coords = provider.approximate(address)
+            if coords is not None:
+                return coords, f'{provider.name}:approximate'
+    return None, ','.join(p.name for p in geocoding_providers)
+
+def geocode_address(address, remote=True, wait=True):
+    """Resolve an address to (lat, lng) through GeocodeCache, then the providers."""
+    cached = lookup_geocode_cache(address)
+    if cached is not None:
+        return None if cached.is_negative else (cached.latitude, cached.longitude)
+    coords, provider_name = resolve_with_providers(address, remote=remote, wait=wait)
+    if coords is not None or remote:
+        store_geocode_cache(address, coords, provider_name)
+    return coords
+
+def claim_geocode_jobs(limit):
+    """Lease up to `limit` due jobs; a crashed worker's lease expires and the job is retried."""
+    now = datetime.utcnow()
+    due = db.or_(GeocodeJob.status == 'pending', GeocodeJob.status == 'running')
+    candidates = (GeocodeJob.query
+                  .filter(due, GeocodeJob.next_attempt_at <= now)
+                  .order_by(GeocodeJob.id)
+                  .limit(limit)
+                  .all())
+    lease_until = now + timedelta(minutes=10)
+    claimed = []
+    for job in candidates:
+        updated = (GeocodeJob.query
+                   .filter_by(id=job.id, status=job.status, next_attempt_at=job.next_attempt_at)
+                   .update({'status': 'running', 'next_attempt_at': lease_until}, synchronize_session=False))
+        if updated:
+            claimed.append(job.id)
+    db.session.commit()
+    return GeocodeJob.query.filter(GeocodeJob.id.in_(claimed)).order_by(GeocodeJob.id).all() if claimed else []
+
+def process_geocode_job(job, wait=True):
+    model, _, lat_attr, lng_attr = GEOCODE_TARGETS[job.target_type]
+    target = model.query.get(job.target_id)
+    if target is None:
+        job.status = 'done'
+        return
+    if getattr(target, lat_attr) is not None and getattr(target, lng_attr) is not None:
+        job.status = 'done'
+        return
+    try:
+        coords = geocode_address(job.address, wait=wait)
+    except GeocodePending as e:
+        job.status = 'pending'
+        job.next_attempt_at = datetime.utcnow() + timedelta(seconds=e.retry_after)
+        return
+    except Exception as e:
+        job.attempts += 1
+        app.logger.error(f"Error geocoding {job.target_type} {job.target_id} '{job.address}': {e}")
+        job.last_error = str(e)[:200]
+        if job.attempts >= app.config['GEOCODE_MAX_ATTEMPTS']:
+            job.status = 'failed'
+        else:
+            job.status = 'pending'
+            job.next_attempt_at = datetime.utcnow() + timedelta(seconds=30 * 2 ** job.attempts)
+        return
+    if coords is None:
+        app.logger.info(f"Could not geocode {job.target_type} address: {job.address}")
+        job.status = 'failed'
+        return
+    lat, lng = coords
+    for attr, value in coordinate_values(job.target_type, lat, lng).items():
+        setattr(target, attr, value)
+    job.status = 'done'
+    app.logger.info(f"Geocoded {job.target_type} '{job.address}' to: {lat}, {lng}")
+
+def run_geocode_batch(limit=None, wait=True):
+    """Drain one batch of the geocoding queue. Returns the number of jobs handled."""
+    jobs = claim_geocode_jobs(limit or app.config['GEOCODE_BATCH_SIZE'])
+    for job in jobs:
+        process_geocode_job(job, wait=wait)
+        db.session.commit()
+    return len(jobs)
+
+def geocode_worker_loop():
+    while True:
+        with app.app_context():
+            try:
+                handled = run_geocode_batch()
+            except Exception as e:
+                app.logger.error(f"Geocode worker error: {e}")
+                db.session.rollback()
+                handled = 0
+        if not handled:
+            socketio.sleep(app.config['GEOCODE_WORKER_IDLE_SECONDS'])
+
+_geocode_worker_started = False
+
+def start_geocode_worker():
+    global _geocode_worker_started
+    if _geocode_worker_started:
+        return
+    _geocode_worker_started = True
+    socketio.start_background_task(geocode_worker_loop)
+    app.logger.info('Geocode worker started')
+
+@app.before_request
+def ensure_geocode_worker():
+    if app.config['GEOCODE_WORKER_AUTOSTART']:
+        start_geocode_worker()
+
+geocode_cli = AppGroup('geocode', help='Geocoding queue maintenance.')
+
+@geocode_cli.command('worker')
+def geocode_worker_command():
+    """Run the geocoding worker in the foreground."""
+    geocode_worker_loop()
+
+def backfill_coordinates(target_type, batch_size=500, concurrency=4, commit_every=100, restart=False):
+    """Geocode rows still missing coordinates, checkpointing each chunk. Returns (rows scanned, rows geocoded)."""
+    model, address_attr, lat_attr, lng_attr = GEOCODE_TARGETS[target_type]
+    lat_col, lng_col = getattr(model, lat_attr), getattr(model, lng_attr)
+    checkpoint_name = f'geocode:{target_type}'
+    checkpoint = BackfillCheckpoint.query.get(checkpoint_name)
+    if checkpoint is None:
+        checkpoint = BackfillCheckpoint(name=checkpoint_name, last_id=0, processed=0)
+        db.session.add(checkpoint)
+    if restart:
+        checkpoint.last_id = 0
+        checkpoint.processed = 0
+    db.session.commit()
+    last_id = resume_id = checkpoint.last_id
+    scanned = geocoded = 0
+    failed = False
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        while True:
+            rows = (db.session.query(model.id, getattr(model, address_attr))
+                    .filter(model.id > last_id, db.or_(lat_col.is_(None), lng_col.is_(None)))
+                    .order_by(model.id)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                break
+            for start in range(0, len(rows), commit_every):
+                chunk = rows[start:start + commit_every]
+                resolved, uncached, errors = {}, {}, set()
+                for _, address in chunk:
+                    key = normalize_address(address or '')
+                    if not key or key in resolved or key in uncached:
+                        continue
+                    cached = lookup_geocode_cache(address)
+                    if cached is not None:
+                        resolved[key] = None if cached.is_negative else (cached.latitude, cached.longitude)
+                    else:
+                        uncached[key] = address
+                futures = {pool.submit(resolve_with_providers, address): key for key, address in uncached.items()}
+                for future in as_completed(futures):
+                    key = futures[future]
+                    try:
+                        coords, provider_name = future.result()
+                    except Exception as e:
+                        app.logger.error(f"Backfill could not geocode '{uncached[key]}': {e}")
+                        errors.add(key)
+                        continue
+                    resolved[key] = coords
+                    store_geocode_cache(uncached[key], coords, provider_name)
+                updates = []
+                for row_id, address in chunk:
+                    key = normalize_address(address or '')
+                    failed = failed or key in errors
+                    coords = resolved.get(key)
+                    if coords is not None:
+                        updates.append(dict(coordinate_values(target_type, *coords), id=row_id))
+                        geocoded += 1
+                    if not failed:
+                        resume_id = row_id
+                    last_id = row_id
+                if updates:
+                    db.session.bulk_update_mappings(model, updates)
+                scanned += len(chunk)
+                checkpoint.last_id = resume_id
+                checkpoint.processed += len(chunk)
+                db.session.commit()
+    return scanned, geocoded
+
+@geocode_cli.command('backfill')
+@click.option('--target', type=click.Choice(['report', 'donation', 'all']), default='all',
+              help='Which table to backfill.')
+@click.option('--batch-size', default=500, show_default=True, help='Rows fetched per keyset page.')
+@click.option('--concurrency', default=None, type=int,
+              help='Concurrent provider calls (default GEOCODE_BACKFILL_CONCURRENCY).')
+@click.option('--commit-every', default=100, show_default=True, help='Rows per commit/checkpoint.')
+@click.option('--restart', is_flag=True, help='Ignore the saved checkpoint and start from the first row.')
+def geocode_backfill_command(target, batch_size, concurrency, commit_every, restart):
+    """Geocode Report and Donation rows that have no coordinates."""
+    concurrency = concurrency or app.config['GEOCODE_BACKFILL_CONCURRENCY']
+    targets = list(GEOCODE_TARGETS) if target == 'all' else [target]
+    for target_type in targets:
+        scanned, geocoded = backfill_coordinates(target_type, batch_size=batch_size, concurrency=concurrency,
+                                                 commit_every=commit_every, restart=restart)
+        click.echo(f"{target_type}: scanned {scanned} rows, geocoded {geocoded}")
+
+@geocode_cli.command('reindex')
+@click.option('--batch-size', default=1000, show_default=True)
+def geocode_reindex_command(batch_size):
+    """Fill geohash cells for rows that have coordinates but no spatial index entry."""
+    for target_type, geohash_attr in GEOHASH_ATTRS.items():
+        model, _, lat_attr, lng_attr = GEOCODE_TARGETS[target_type]
+        lat_col, lng_col = getattr(model, lat_attr), getattr(model, lng_attr)
+        last_id, total = 0, 0
+        while True:
+            rows = (db.session.query(model.id, lat_col, lng_col)
+                    .filter(model.id > last_id, getattr(model, geohash_attr).is_(None),
+                            lat_col.isnot(None), lng_col.isnot(None))
+                    .order_by(model.id)
+                    .limit(batch_size)
+                    .all())
+            if not rows:
+                break
+            db.session.bulk_update_mappings(model, [
+                {'id': row_id, geohash_attr: geohash_encode(lat, lng)} for row_id, lat, lng in rows
+            ])
+            db.session.commit()
+            last_id = rows[-1][0]
+            total += len(rows)
+        click.echo(f"{target_type}: indexed {total} rows")
+
+app.cli.add_command(geocode_cli)
+
 # --- Templates ---
 # Using Bootstrap for a modern look and responsive design.
 templates = {
@@ -361,6 +1981,9 @@ templates = {
       </li>
     {% endfor %}
   </ul>
+  {% if next_cursor %}
+    <a href="{{ url_for('donations', cursor=next_cursor, per_page=request.args.get('per_page')) }}" class="btn btn-secondary mt-3">Older Donations</a>
+  {% endif %}
 {% endblock %}
 ''',
 
@@ -406,6 +2029,9 @@ templates = {
       </li>
     {% endfor %}
   </ul>
+  {% if next_cursor %}
+    <a href="{{ url_for('reports', cursor=next_cursor, per_page=request.args.get('per_page')) }}" class="btn btn-secondary mt-3">Older Reports</a>
+  {% endif %}
 {% endblock %}
 ''',
 
@@ -419,13 +2045,14 @@ templates = {
         <strong>{{ event.title }}</strong> - {{ event.event_time.strftime('%Y-%m-%d %H:%M') }} at {{ event.location }}<br>
         {{ event.description }}<br>
         Participants: {{ event.participants|length }}<br>
-        {% if current_user not in event.participants %}
+        {% if current_user.id not in event.participants|map(attribute='id')|list %}
           <form action="{{ url_for('signup_event', event_id=event.id) }}" method="POST" class="d-inline">
             <button type="submit" class="btn btn-sm btn-primary mt-1">Sign Up</button>
           </form>
         {% else %}
           <span class="badge bg-success">Signed Up</span>
         {% endif %}
+        <a href="{{ url_for('leaderboard', window='event', event_id=event.id) }}" class="btn btn-sm btn-link mt-1">Leaderboard</a>
       </li>
     {% endfor %}
   </ul>
@@ -513,12 +2140,20 @@ templates = {
     "leaderboard.html": '''
 {% extends "base.html" %}
 {% block content %}
-  <h1 class="mb-4">Community Leaderboard</h1>
+  <h1 class="mb-4">Community Leaderboard{% if event %}: {{ event.title }}{% endif %}</h1>
+  <ul class="nav nav-pills mb-3">
+    {% for key, label in [('all', 'All time'), ('week', 'This week'), ('month', 'This month')] %}
+      <li class="nav-item"><a class="nav-link {% if window == key %}active{% endif %}" href="{{ url_for('leaderboard', window=key) }}">{{ label }}</a></li>
+    {% endfor %}
+  </ul>
   <ul class="list-group">
     {% for user in users %}
       <li class="list-group-item"><strong>{{ user.username }}</strong> - {{ user.points }} points</li>
     {% endfor %}
   </ul>
+  {% if my_rank %}
+    <p class="mt-3">Your rank: #{{ my_rank }}</p>
+  {% endif %}
 {% endblock %}
 ''',
 
@@ -572,6 +2207,50 @@ templates = {
     {% endfor %}
   </ul>
 {% endblock %}
+''',
+
+    "map_layer.html": '''
+<script>
+  // Keeps a Leaflet layer in sync with a GeoJSON endpoint: refetches on moveend and
+  // draws server-side clusters as sized circles, individual features via renderPopup.
+  function escapeHtml(text) {
+    var div = document.createElement('div');
+    div.textContent = text == null ? '' : text;
+    return div.innerHTML;
+  }
+  function bindGeoJsonLayer(map, url, renderPopup, extraParams) {
+    var layer = L.layerGroup().addTo(map);
+    function load() {
+      var params = new URLSearchParams({bbox: map.getBounds().toBBoxString(), zoom: map.getZoom()});
+      Object.keys(extraParams || {}).forEach(function(key) {
+        if (extraParams[key]) { params.set(key, extraParams[key]); }
+      });
+      fetch(url + "?" + params.toString())
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+          layer.clearLayers();
+          data.features.forEach(function(feature) {
+            var p = feature.properties;
+            var latlng = [feature.geometry.coordinates[1], feature.geometry.coordinates[0]];
+            if (p.cluster) {
+              var breakdown = Object.keys(p.breakdown).map(function(key) {
+                return escapeHtml(key) + ": " + p.breakdown[key];
+              }).join("<br>");
+              L.circleMarker(latlng, {radius: Math.min(40, 8 + 4 * Math.log2(p.count)), weight: 1, fillOpacity: 0.6})
+                .addTo(layer)
+                .bindPopup("<strong>" + p.count + "</strong><br>" + breakdown)
+                .on('dblclick', function() { map.setView(latlng, map.getZoom() + 2); });
+            } else {
+              L.marker(latlng).addTo(layer).bindPopup(renderPopup(p));
+            }
+          });
+        });
+    }
+    map.on('moveend', load);
+    load();
+    return layer;
+  }
+</script>
 ''',
 
     "donation_map.html": '''
@@ -580,15 +2259,15 @@ templates = {
   <h1 class="mb-4">Donation Map</h1>
   <div id="map" style="width: 100%; height: 500px;"></div>
   <script src="https://unpkg.com/leaflet@1.9.3/dist/leaflet.js" crossorigin=""></script>
+  {% include "map_layer.html" %}
   <script>
     document.addEventListener("DOMContentLoaded", function() {
       var map = L.map('map').setView([12.9716, 77.5946], 13);
       L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
         attribution: '© OpenStreetMap contributors'
       }).addTo(map);
-      var markers = {{ markers|tojson }};
-      markers.forEach(function(marker) {
-        L.marker([marker.lat, marker.lng]).addTo(map).bindPopup(marker.popup);
+      bindGeoJsonLayer(map, "{{ url_for('donations_geojson') }}", function(p) {
+        return "Donation: " + escapeHtml(p.description);
       });
       if (navigator.geolocation) {
         navigator.geolocation.getCurrentPosition(function(position) {
@@ -611,18 +2290,37 @@ templates = {
 {% extends "base.html" %}
 {% block content %}
   <h1 class="mb-4">Reports Map</h1>
+  <form method="GET" class="d-flex mb-3">
+    <select name="animal_type" class="form-select me-2" onchange="this.form.submit()">
+      <option value="">All animals</option>
+      {% for facet in animal_facets %}
+        <option value="{{ facet.animal_type }}" {% if facet.animal_type == selected_animal %}selected{% endif %}>{{ facet.animal_type|title }} ({{ facet.count }})</option>
+      {% endfor %}
+    </select>
+  </form>
   <div id="map" style="width: 100%; height: 500px;"></div>
   <script src="https://unpkg.com/leaflet@1.9.3/dist/leaflet.js" crossorigin=""></script>
+  <script src="https://unpkg.com/leaflet.heat@0.2.0/dist/leaflet-heat.js"></script>
+  {% include "map_layer.html" %}
   <script>
     document.addEventListener("DOMContentLoaded", function() {
       var map = L.map('map').setView([12.9716, 77.5946], 13);
       L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
         attribution: '© OpenStreetMap contributors'
       }).addTo(map);
-      var markers = {{ markers|tojson }};
-      markers.forEach(function(marker) {
-        L.marker([marker.lat, marker.lng]).addTo(map).bindPopup(marker.popup);
-      });
+      bindGeoJsonLayer(map, "{{ url_for('reports_geojson') }}", function(p) {
+        return "<strong>" + escapeHtml(p.animal_type) + "</strong><br>" + escapeHtml(p.description) +
+          "<br><em>" + escapeHtml(p.location) + "</em><br><a href='" + p.url + "' target='_blank'>View Details</a>";
+      }, {category: {{ selected_animal|tojson }}});
+      var heatParams = new URLSearchParams();
+      if ({{ selected_animal|tojson }}) { heatParams.set('animal_type', {{ selected_animal|tojson }}); }
+      fetch("{{ url_for('reports_heatmap') }}?" + heatParams.toString())
+        .then(function(response) { return response.json(); })
+        .then(function(data) {
+          var maxCount = data.points.reduce(function(m, p) { return Math.max(m, p[2]); }, 1);
+          var heatLayer = L.heatLayer(data.points, {radius: 25, max: maxCount});
+          L.control.layers(null, {"Heatmap": heatLayer}).addTo(map);
+        });
     });
   </script>
 {% endblock %}
@@ -649,15 +2347,22 @@ templates = {
 {% block content %}
   <h1 class="mb-4">Feedback Sentiment Analysis</h1>
   <ul class="list-group">
-    {% for result in sentiment_results %}
+    {% for fb in feedbacks %}
       <li class="list-group-item">
-        <strong>{{ result.feedback.user.username if result.feedback.user else "Anonymous" }}</strong>: 
-        "{{ result.feedback.message }}"<br>
-        Polarity: {{ result.polarity }}, Subjectivity: {{ result.subjectivity }}<br>
-        Submitted at: {{ result.feedback.submitted_at.strftime("%Y-%m-%d %H:%M") }}
+        <strong>{{ fb.user.username if fb.user else "Anonymous" }}</strong>: 
+        "{{ fb.message }}"<br>
+        {% if fb.polarity is not none %}
+          Polarity: {{ fb.polarity }}, Subjectivity: {{ fb.subjectivity }}<br>
+        {% else %}
+          <em>Sentiment pending</em><br>
+        {% endif %}
+        Submitted at: {{ fb.submitted_at.strftime("%Y-%m-%d %H:%M") }}
       </li>
     {% endfor %}
   </ul>
+  {% if next_cursor %}
+    <a href="{{ url_for('feedback_sentiment_unique', cursor=next_cursor, per_page=request.args.get('per_page')) }}" class="btn btn-secondary mt-3">Older Feedback</a>
+  {% endif %}
   <a href="{{ url_for('feedback') }}" class="btn btn-secondary mt-3">Return to Feedback</a>
 {% endblock %}
 '''
@@ -739,19 +2444,208 @@ def service_worker_route():
     return app.response_class(service_worker_js, mimetype='application/javascript')
 
 # --- New AI/ML Enhancement: Feedback Sentiment Analysis ---
+def score_sentiment(text):
+    sentiment = TextBlob(text or '').sentiment
+    return sentiment.polarity, sentiment.subjectivity
+
+def record_sentiment_rollup(fb):
+    upsert_increment(DailySentimentRollup, {'day': (fb.submitted_at or datetime.utcnow()).date()},
+                     feedback_count=1, polarity_sum=fb.polarity, subjectivity_sum=fb.subjectivity,
+                     negative_count=int(fb.polarity < 0))
+    bump_cache_version('sentiment')
+
+def rebuild_sentiment_rollup():
+    """Recompute DailySentimentRollup from scored feedback. Returns the number of days."""
+    DailySentimentRollup.query.delete()
+    day = db.func.date(Feedback.submitted_at)
+    rows = (db.session.query(day, db.func.count(Feedback.id), db.func.sum(Feedback.polarity),
+                             db.func.sum(Feedback.subjectivity),
+                             db.func.sum(db.case((Feedback.polarity < 0, 1), else_=0)))
+            .filter(Feedback.polarity.isnot(None), Feedback.submitted_at.isnot(None))
+            .group_by(day).all())
+    db.session.bulk_insert_mappings(DailySentimentRollup, [
+        {'day': _as_date(d), 'feedback_count': count, 'polarity_sum': polarity, 'subjectivity_sum': subjectivity,
+         'negative_count': negative} for d, count, polarity, subjectivity, negative in rows
+    ])
+    bump_cache_version('sentiment')
+    db.session.commit()
+    return len(rows)
+
+def score_feedback(feedback_id):
+    """Background task: score one Feedback row unless it has been scored already."""
+    with app.app_context():
+        fb = Feedback.query.get(feedback_id)
+        if fb is None or fb.polarity is not None:
+            return
+        fb.polarity, fb.subjectivity = score_sentiment(fb.message)
+        record_sentiment_rollup(fb)
+        db.session.commit()
+
+def sentiment_trend(granularity='day', start=None, end=None):
+    """Mean polarity/subjectivity, volume and negative share per day or ISO week, from the rollup."""
+    period = period_bucket(DailySentimentRollup.day, granularity)
+    query = db.session.query(period, db.func.sum(DailySentimentRollup.feedback_count),
+                             db.func.sum(DailySentimentRollup.polarity_sum),
+                             db.func.sum(DailySentimentRollup.subjectivity_sum),
+                             db.func.sum(DailySentimentRollup.negative_count))
+    if start:
+        query = query.filter(DailySentimentRollup.day >= start)
+    if end:
+        query = query.filter(DailySentimentRollup.day <= end)
+    return [{
+        'period': str(_as_date(p)),
+        'count': count,
+        'mean_polarity': polarity / count,
+        'mean_subjectivity': subjectivity / count,
+        'negative_share': negative / count,
+    } for p, count, polarity, subjectivity, negative in query.group_by(period).order_by(period).all() if count]
+
+def _warm_sentiment_worker():
+    # Pay TextBlob's lazy analyzer/corpus loading once per worker process, not per chunk.
+    TextBlob('warm up').sentiment
+
+def _score_chunk(chunk):
+    return [(feedback_id,) + score_sentiment(message) for feedback_id, message in chunk]
+
+def batch_score_sentiment(rescore=False, batch_size=5000, chunk_size=200, workers=None):
+    """Score Feedback rows across a process pool and write them back in bulk. Returns the number scored."""
+    last_id, scored = 0, 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_sentiment_worker) as pool:
+        while True:
+            query = db.session.query(Feedback.id, Feedback.message).filter(Feedback.id > last_id)
+            if not rescore:
+                query = query.filter(Feedback.polarity.is_(None))
+            rows = [(feedback_id, message) for feedback_id, message in
+                    query.order_by(Feedback.id).limit(batch_size).all()]
+            if not rows:
+                rebuild_sentiment_rollup()
+                return scored
+            chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+            updates = [{'id': feedback_id, 'polarity': polarity, 'subjectivity': subjectivity}
+                       for results in pool.map(_score_chunk, chunks)
+                       for feedback_id, polarity, subjectivity in results]
+            db.session.bulk_update_mappings(Feedback, updates)
+            db.session.commit()
+            last_id = rows[-1][0]
+            scored += len(rows)
+
+sentiment_cli = AppGroup('sentiment', help='Feedback sentiment scoring.')
+
+@sentiment_cli.command('backfill')
+@click.option('--all', 'rescore', is_flag=True, help='Re-score every row, not just unscored ones.')
+@click.option('--workers', default=None, type=int, help='Scoring processes (default: CPU count).')
+@click.option('--batch-size', default=5000, show_default=True, help='Rows read and committed per batch.')
+@click.option('--chunk-size', default=200, show_default=True, help='Rows sent to a worker at a time.')
+def sentiment_backfill_command(rescore, workers, batch_size, chunk_size):
+    """Score feedback sentiment in parallel across CPU cores."""
+    scored = batch_score_sentiment(rescore=rescore, batch_size=batch_size, chunk_size=chunk_size, workers=workers)
+    click.echo(f"Scored {scored} feedback rows")
+
+@sentiment_cli.command('rebuild-rollup')
+def sentiment_rebuild_rollup_command():
+    """Rebuild the daily sentiment rollup from scored feedback."""
+    click.echo(f"Rebuilt {rebuild_sentiment_rollup()} daily sentiment rows")
+
+app.cli.add_command(sentiment_cli)
+
+@app.route('/api/feedback/sentiment/trend')
+@login_required
+def feedback_sentiment_trend():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'admin only'}), 403
+    granularity = request.args.get('granularity', 'day')
+    if granularity not in ('day', 'week'):
+        return jsonify({'error': 'granularity must be day or week'}), 400
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
+    points = stats_cache.get_or_compute('sentiment_trend', [granularity, start, end], ['sentiment'],
+                                        lambda: sentiment_trend(granularity, start, end))
+    return jsonify({'granularity': granularity, 'points': points})
+
 @app.route('/feedback/sentiment', endpoint='feedback_sentiment_unique')
 @login_required
+@query_budget(3)
 def feedback_sentiment():
-    feedbacks = Feedback.query.order_by(Feedback.submitted_at.desc()).all()
-    sentiment_results = []
-    for fb in feedbacks:
-        analysis = TextBlob(fb.message)
-        sentiment_results.append({
-            'feedback': fb,
-            'polarity': analysis.sentiment.polarity,
-            'subjectivity': analysis.sentiment.subjectivity
-        })
-    return render_template("feedback_sentiment.html", sentiment_results=sentiment_results)
+    query = Feedback.query.options(db.joinedload(Feedback.user))
+    try:
+        feedbacks, next_cursor = keyset_page(query, Feedback.submitted_at, Feedback.id,
+                                             request.args.get('cursor'), requested_page_size())
+    except ValueError:
+        abort(400)
+    return render_template("feedback_sentiment.html", feedbacks=feedbacks, next_cursor=next_cursor)
+
+# --- Login Cache ---
+class UserSnapshot(UserMixin):
+    """Detached copy of the User columns current_user needs; reading it never touches the DB."""
+
+    def __init__(self, id, username, role, email):
+        self.id = id
+        self.username = username
+        self.role = role
+        self.email = email
+
+    def __repr__(self):
+        return f'<UserSnapshot {self.username}>'
+
+user_cache = TTLCache(app.config['USER_CACHE_SIZE'], app.config['USER_CACHE_SECONDS'])
+
+@login_manager.user_loader
+def load_user(user_id):
+    def compute():
+        row = db.session.query(User.id, User.username, User.role, User.email).filter_by(id=int(user_id)).first()
+        return UserSnapshot(*row) if row else None
+    # Other worker processes only see a profile change once their entry's TTL runs out.
+    return user_cache.get_or_compute(int(user_id), compute)
+
+# --- Password Hashing ---
+class PasswordHasherBusy(RuntimeError):
+    pass
+
+class PasswordHasher:
+    """Password hashing on a bounded thread pool; raises PasswordHasherBusy when it is saturated."""
+
+    def __init__(self, method, salt_length, workers, max_pending):
+        self.method = method
+        self.salt_length = salt_length
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self._slots = threading.BoundedSemaphore(workers + max_pending)
+        self._prefix = None
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise PasswordHasherBusy('password hashing pool is saturated')
+        try:
+            future = self._pool.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future.result()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method, self.salt_length)
+
+    def verify(self, pwhash, password):
+        return self._run(check_password_hash, pwhash, password)
+
+    def needs_rehash(self, pwhash):
+        """True when `pwhash` was made with a different method, iteration count or salt length."""
+        if self._prefix is None:
+            # Werkzeug fills in its default iteration count, so read the full prefix off a real hash.
+            self._prefix = self.hash('').split('$', 1)[0]
+        method, _, rest = pwhash.partition('$')
+        return method != self._prefix or len(rest.split('$', 1)[0]) != self.salt_length
+
+password_hasher = PasswordHasher(app.config['PASSWORD_HASH_METHOD'], app.config['PASSWORD_SALT_LENGTH'],
+                                 app.config['PASSWORD_HASH_WORKERS'], app.config['PASSWORD_HASH_MAX_PENDING'])
+
+@app.errorhandler(PasswordHasherBusy)
+def password_hasher_busy(error):
+    app.logger.warning(f"Rejected {request.endpoint}: {error}")
+    return "Too many sign-ins right now, please try again in a moment.", 503, {'Retry-After': '1'}
 
 # --- Main Routes ---
 @app.route('/')
@@ -768,10 +2662,11 @@ def register():
         if User.query.filter_by(email=email).first():
             flash('Email already registered. Please use a different email.')
             return redirect(url_for('register'))
-        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        hashed_password = password_hasher.hash(password)
         new_user = User(username=username, password=hashed_password, email=email, role=role)
         db.session.add(new_user)
         db.session.commit()
+        rank_index.add(new_user.id, new_user.username)
         flash('Registration successful! Please login.')
         return redirect(url_for('login'))
     return render_template("register.html")
@@ -782,7 +2677,10 @@ def login():
         username = request.form['username']
         password = request.form['password']
         user = User.query.filter_by(username=username).first()
-        if user and check_password_hash(user.password, password):
+        if user and password_hasher.verify(user.password, password):
+            if password_hasher.needs_rehash(user.password):
+                user.password = password_hasher.hash(password)
+                db.session.commit()
             login_user(user)
             return redirect(url_for('dashboard'))
         flash('Invalid username or password')
@@ -805,9 +2703,15 @@ def logout():
 @login_required
 def profile():
     if request.method == 'POST':
-        current_user.username = request.form['username']
-        current_user.email = request.form['email']
+        user = User.query.get(current_user.id)
+        renamed = user.username != request.form['username']
+        user.username = request.form['username']
+        user.email = request.form['email']
+        if renamed:
+            bump_cache_version('leaderboard')
         db.session.commit()
+        user_cache.discard(user.id)
+        rank_index.add(user.id, user.username)
         flash('Profile updated successfully!')
         return redirect(url_for('dashboard'))
     return render_template("profile.html")
@@ -831,7 +2735,9 @@ def add_donation():
             donor_id=current_user.id
         )
         db.session.add(new_donation)
-        current_user.points += 10
+        enqueue_geocode('donation', new_donation)
+        record_donation_rollup(new_donation)
+        award_points(current_user, 10, 'donation')
         db.session.commit()
         flash('Donation added successfully!')
         send_notification("New Donation", [current_user.email], f"Your donation '{description}' has been added.")
@@ -839,11 +2745,37 @@ def add_donation():
         return redirect(url_for('dashboard'))
     return render_template("add_donation.html")
 
+def donations_page():
+    query = Donation.query.options(db.joinedload(Donation.donor))
+    try:
+        return keyset_page(query, Donation.pickup_time, Donation.id, request.args.get('cursor'), requested_page_size())
+    except ValueError:
+        abort(400)
+
 @app.route('/donations')
 @login_required
+@query_budget(2)
 def donations():
-    donations_list = Donation.query.all()
-    return render_template("donations.html", donations=donations_list)
+    donations_list, next_cursor = donations_page()
+    return render_template("donations.html", donations=donations_list, next_cursor=next_cursor)
+
+@app.route('/api/donations')
+@login_required
+@query_budget(2)
+def donations_api():
+    donations_list, next_cursor = donations_page()
+    return jsonify({
+        'items': [{
+            'id': d.id,
+            'description': d.description,
+            'food_type': d.food_type,
+            'quantity': d.quantity,
+            'pickup_location': d.pickup_location,
+            'pickup_time': d.pickup_time.isoformat() if d.pickup_time else None,
+            'donor': d.donor.username,
+        } for d in donations_list],
+        'next_cursor': next_cursor,
+    })
 
 @app.route('/report_animal', methods=['GET', 'POST'])
 @login_required
@@ -867,7 +2799,10 @@ def report_animal():
                 file.save(os.path.join(app.config['UPLOAD_FOLDER'], filename))
                 new_report.image_filename = filename
         db.session.add(new_report)
-        current_user.points += 5
+        enqueue_geocode('report', new_report)
+        record_report_rollup(new_report)
+        record_animal_type_facet(new_report)
+        award_points(current_user, 5, 'report')
         db.session.commit()
         flash('Report submitted successfully!')
         send_notification("New Report", [current_user.email], f"Your report for {animal_type} has been submitted.")
@@ -875,11 +2810,56 @@ def report_animal():
         return redirect(url_for('dashboard'))
     return render_template("report_animal.html")
 
+def reports_page():
+    try:
+        return keyset_page(Report.query, Report.report_time, Report.id, request.args.get('cursor'), requested_page_size())
+    except ValueError:
+        abort(400)
+
 @app.route('/reports')
 @login_required
+@query_budget(2)
 def reports():
-    reports_list = Report.query.all()
-    return render_template("reports.html", reports=reports_list)
+    reports_list, next_cursor = reports_page()
+    return render_template("reports.html", reports=reports_list, next_cursor=next_cursor)
+
+@app.route('/api/reports')
+@login_required
+@query_budget(2)
+def reports_api():
+    reports_list, next_cursor = reports_page()
+    return jsonify({
+        'items': [{
+            'id': r.id,
+            'animal_type': r.animal_type,
+            'description': r.description,
+            'location': r.location,
+            'report_time': r.report_time.isoformat() if r.report_time else None,
+            'latitude': r.latitude,
+            'longitude': r.longitude,
+            'url': url_for('report_details', report_id=r.id),
+        } for r in reports_list],
+        'next_cursor': next_cursor,
+    })
+
+@app.route('/api/reports/search')
+@login_required
+@query_budget(2)
+def reports_search():
+    page = max(1, request.args.get('page', 1, type=int))
+    results, has_more = search_reports(request.args.get('q', ''), page, requested_page_size())
+    return jsonify({
+        'items': [{
+            'id': report.id,
+            'animal_type': report.animal_type,
+            'description': report.description,
+            'location': report.location,
+            'rank': rank,
+            'url': url_for('report_details', report_id=report.id),
+        } for report, rank in results],
+        'page': page,
+        'next_page': page + 1 if has_more else None,
+    })
 
 @app.route('/events')
 @login_required
@@ -891,8 +2871,8 @@ def events():
 @login_required
 def signup_event(event_id):
     event = Event.query.get_or_404(event_id)
-    if current_user not in event.participants:
-        event.participants.append(current_user)
+    if not any(user.id == current_user.id for user in event.participants):
+        event.participants.append(User.query.get(current_user.id))
         db.session.commit()
         flash('Signed up for event successfully!')
     else:
@@ -924,93 +2904,99 @@ def stats():
     if current_user.role != 'admin':
         flash('You are not authorized to view analytics.')
         return redirect(url_for('dashboard'))
-    total_donations = Donation.query.count()
-    total_quantity = db.session.query(db.func.sum(Donation.quantity)).scalar() or 0
-    donation_data = {}
-    for d in Donation.query.all():
-        key = d.pickup_time.strftime("%Y-%m") if d.pickup_time else "Unknown"
-        donation_data[key] = donation_data.get(key, 0) + 1
-    sorted_donation_keys = sorted(donation_data.keys())
-    donation_chart = {'labels': sorted_donation_keys, 'counts': [donation_data[k] for k in sorted_donation_keys]}
-    report_data = {}
-    for r in Report.query.all():
-        key = r.report_time.strftime("%Y-%m")
-        report_data[key] = report_data.get(key, 0) + 1
-    sorted_report_keys = sorted(report_data.keys())
-    report_chart = {'labels': sorted_report_keys, 'counts': [report_data[k] for k in sorted_report_keys]}
-    return render_template("stats.html", donation_data=donation_chart, report_data=report_chart, total_donations=total_donations, total_quantity=total_quantity)
+    payload = stats_cache.get_or_compute('dashboard', None, ['donations', 'reports'], dashboard_stats)
+    return render_template("stats.html", **payload)
+
+@app.route('/api/stats')
+@login_required
+def stats_api():
+    if current_user.role != 'admin':
+        return jsonify({'error': 'admin only'}), 403
+    metric = request.args.get('metric', 'donations')
+    granularity = request.args.get('granularity', 'day')
+    group_by = request.args.get('group_by') or None
+    if metric not in STATS_METRICS:
+        return jsonify({'error': f"metric must be one of {', '.join(STATS_METRICS)}"}), 400
+    if granularity not in STATS_GRANULARITIES:
+        return jsonify({'error': f"granularity must be one of {', '.join(STATS_GRANULARITIES)}"}), 400
+    if group_by and group_by not in STATS_METRICS[metric][2]:
+        return jsonify({'error': f"group_by for {metric} must be one of {', '.join(STATS_METRICS[metric][2])}"}), 400
+    try:
+        start = datetime.strptime(request.args['from'], '%Y-%m-%d').date() if request.args.get('from') else None
+        end = datetime.strptime(request.args['to'], '%Y-%m-%d').date() if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'from and to must be YYYY-MM-DD'}), 400
+    key = [metric, start, end, granularity, group_by]
+    payload = stats_cache.get_or_compute('series', key, [STATS_METRIC_TAGS[metric]],
+                                         lambda: stats_series(metric, start, end, granularity, group_by))
+    return jsonify(dict(payload, metric=metric, granularity=granularity, group_by=group_by))
 
 @app.route('/leaderboard')
 @login_required
 def leaderboard():
-    users = User.query.order_by(User.points.desc()).limit(10).all()
-    return render_template("leaderboard.html", users=users)
+    window = request.args.get('window', 'all')
+    event_id = request.args.get('event_id', type=int)
+    if window not in LEADERBOARD_WINDOWS or (window == 'event') != (event_id is not None):
+        abort(400)
+    event = Event.query.get_or_404(event_id) if window == 'event' else None
+    users = leaderboard_top(window, event_id)
+    my_rank = rank_index.rank(current_user.id) if window == 'all' else None
+    return render_template("leaderboard.html", users=users, window=window, event=event, my_rank=my_rank)
 
 @app.route('/map')
 @login_required
 def map_view():
     animal_filter = request.args.get('animal_type', '')
-    if animal_filter:
-        reports_all = Report.query.filter(Report.animal_type.ilike(f'%{animal_filter}%')).all()
-    else:
-        reports_all = Report.query.all()
-    distinct_animals = [r[0] for r in db.session.query(Report.animal_type).distinct().all()]
-    markers = []
-    heat_data = []
-    for report in reports_all:
-        if report.latitude is not None and report.longitude is not None:
-            lat, lng = report.latitude, report.longitude
-        else:
-            try:
-                location_obj = geolocator.geocode(report.location)
-                if location_obj:
-                    lat = location_obj.latitude
-                    lng = location_obj.longitude
-                    report.latitude = lat
-                    report.longitude = lng
-                    db.session.commit()
-                    app.logger.info(f"Geocoded '{report.location}' to: {lat}, {lng}")
-                else:
-                    app.logger.info(f"Could not geocode address: {report.location}. Using default coordinates.")
-                    lat, lng = 12.9716, 77.5946
-            except Exception as e:
-                app.logger.error(f"Error geocoding address '{report.location}': {e}. Using default coordinates.")
-                lat, lng = 12.9716, 77.5946
-            time.sleep(1)
-        details_link = url_for('report_details', report_id=report.id)
-        popup_html = f"<strong>{report.animal_type}</strong><br>{report.description}<br><em>{report.location}</em><br><a href='{details_link}' target='_blank'>View Details</a>"
-        markers.append({"lat": lat, "lng": lng, "popup": popup_html})
-        heat_data.append([lat, lng, 1])
-    app.logger.info(f"Markers for reports map: {markers}")
-    return render_template("map.html", markers=markers, distinct_animals=distinct_animals, selected_animal=animal_filter, heat_data=heat_data)
+    return render_template("map.html", animal_facets=animal_type_facets(), selected_animal=animal_filter)
+
+@app.route('/api/reports/facets')
+@login_required
+def reports_facets():
+    return jsonify({'animal_type': animal_type_facets()})
+
+@app.route('/api/reports/heatmap')
+@login_required
+def reports_heatmap():
+    animal_filter = normalize_category(request.args['animal_type']) if request.args.get('animal_type') else ''
+    try:
+        days = int(request.args['days']) if request.args.get('days') else None
+    except ValueError:
+        days = -1
+    windows = app.config['HEATMAP_WINDOWS_DAYS']
+    if days is not None and days not in windows:
+        return jsonify({'error': f"days must be one of {', '.join(map(str, windows))}"}), 400
+    # Only reported animal types get a grid, so arbitrary filters cannot grow the cache.
+    known = animal_filter == '' or any(f['animal_type'] == animal_filter for f in animal_type_facets())
+    return jsonify({
+        'cell_degrees': app.config['HEATMAP_CELL_DEGREES'],
+        'points': heatmap_cache.points(animal_filter, days) if known else [],
+    })
+
+@app.route('/api/reports/geojson')
+@login_required
+def reports_geojson():
+    return layer_geojson('reports', lambda report: {
+        'id': report.id,
+        'animal_type': report.animal_type,
+        'description': report.description,
+        'location': report.location,
+        'url': url_for('report_details', report_id=report.id),
+    })
+
+@app.route('/api/donations/geojson')
+@login_required
+def donations_geojson():
+    return layer_geojson('donations', lambda donation: {
+        'id': donation.id,
+        'description': donation.description,
+        'food_type': donation.food_type,
+        'quantity': donation.quantity,
+    })
 
 @app.route('/donation_map')
 @login_required
 def donation_map():
-    donations_all = Donation.query.all()
-    markers = []
-    for donation in donations_all:
-        if donation.pickup_latitude is not None and donation.pickup_longitude is not None:
-            lat, lng = donation.pickup_latitude, donation.pickup_longitude
-        else:
-            try:
-                location_obj = geolocator.geocode(donation.pickup_location)
-                if location_obj:
-                    lat = location_obj.latitude
-                    lng = location_obj.longitude
-                    donation.pickup_latitude = lat
-                    donation.pickup_longitude = lng
-                    db.session.commit()
-                    app.logger.info(f"Geocoded donation '{donation.pickup_location}' to: {lat}, {lng}")
-                else:
-                    app.logger.info(f"Could not geocode donation location: {donation.pickup_location}")
-                    continue
-                time.sleep(1)
-            except Exception as e:
-                app.logger.error(f"Error geocoding donation location '{donation.pickup_location}': {e}")
-                continue
-        markers.append({"lat": lat, "lng": lng, "popup": f"Donation: {donation.description}"})
-    return render_template("donation_map.html", markers=markers)
+    return render_template("donation_map.html")
 
 @app.route('/report_details/<int:report_id>')
 @login_required
@@ -1020,15 +3006,17 @@ def report_details(report_id):
 
 @app.route('/feedback', methods=['GET', 'POST'])
 @login_required
+@query_budget(3)
 def feedback():
     if request.method == 'POST':
         message = request.form['message']
         new_feedback = Feedback(user_id=current_user.id, message=message)
         db.session.add(new_feedback)
         db.session.commit()
+        socketio.start_background_task(score_feedback, new_feedback.id)
         flash('Thank you for your feedback!')
         return redirect(url_for('feedback'))
-    feedbacks = Feedback.query.order_by(Feedback.submitted_at.desc()).limit(10).all()
+    feedbacks = Feedback.query.options(db.joinedload(Feedback.user)).order_by(Feedback.submitted_at.desc()).limit(10).all()
     return render_template("feedback.html", feedbacks=feedbacks)
 
 @app.route('/volunteer_chat')
@@ -1045,6 +3033,8 @@ def handle_message(msg):
 # --- Database Creation ---
 with app.app_context():
     db.create_all()
+    ensure_report_search_index()
+    rank_index.seed(db.session.query(User.id, User.username, User.points).all())
 
 # --- Run the App ---
 if __name__ == '__main__':
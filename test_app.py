@@ -0,0 +1,323 @@
+import itertools
+import os
+import tempfile
+import threading
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+from werkzeug.security import generate_password_hash
+
+_tmp = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite://'
+os.environ['GEOCODE_WORKER_AUTOSTART'] = '0'
+os.environ['RATE_LIMIT_DB_PATH'] = os.path.join(_tmp, 'ratelimit.db')
+
+from app import (  # noqa: E402
+    app, db, User, Report, Donation, Feedback, BackfillCheckpoint, GazetteerIndex, GeocodeCache, BENGALURU_GAZETTEER,
+    CacheVersion, RankIndex, SQLiteRankBackend, award_points, bump_cache_version, leaderboard_top, load_user,
+    password_hasher, rank_index, heatmap_cache, stats_cache, backfill_coordinates, store_geocode_cache,
+    hot_queries, explain_query_plan, full_table_scans,
+)
+
+app.config['TESTING'] = True
+_names = itertools.count(1)
+
+
+def make_user(role='user', password='secret', pwhash=None):
+    """Create a user with a fresh username; returns (id, username)."""
+    username = f'user{next(_names)}'
+    with app.app_context():
+        user = User(username=username, email=f'{username}@example.com', role=role,
+                    password=pwhash or password_hasher.hash(password))
+        db.session.add(user)
+        db.session.commit()
+        rank_index.add(user.id, user.username)
+        return user.id, username
+
+
+def login(username, password='secret'):
+    client = app.test_client()
+    response = client.post('/login', data={'username': username, 'password': password})
+    assert response.status_code == 302
+    return client
+
+
+@pytest.fixture
+def admin():
+    return make_user(role='admin')
+
+
+@pytest.fixture
+def client(admin):
+    return login(admin[1])
+
+
+def test_submit_report_and_donation(client, admin):
+    response = client.post('/report_animal', data={
+        'animal_type': 'Dog', 'description': 'Limping near the bus stop',
+        'location': 'Koramangala', 'contact': '9999999999',
+    })
+    assert response.status_code == 302
+    response = client.post('/add_donation', data={
+        'description': 'Rice and curd', 'food_type': 'Cooked', 'quantity': '5',
+        'pickup_location': 'Indiranagar', 'pickup_time': '2024-05-01T10:30',
+    })
+    assert response.status_code == 302
+    with app.app_context():
+        assert Report.query.filter_by(description='Limping near the bus stop', reporter_id=admin[0]).count() == 1
+        assert Donation.query.filter_by(description='Rice and curd', donor_id=admin[0]).count() == 1
+        assert db.session.get(User, admin[0]).points == 15
+
+
+def test_pages_stay_within_query_budgets(client, admin):
+    with app.app_context():
+        db.session.add(Feedback(user_id=admin[0], message='Lovely people', polarity=0.5, subjectivity=0.6))
+        db.session.commit()
+    client.post('/report_animal', data={
+        'animal_type': 'Cat', 'description': 'Budget', 'location': 'Koramangala', 'contact': '1',
+    })
+    for path in ('/stats', '/donations', '/feedback/sentiment', '/reports'):
+        assert client.get(path).status_code == 200, path
+    cursor = client.get('/api/reports', query_string={'per_page': 1}).json['next_cursor']
+    while cursor:
+        assert client.get('/reports', query_string={'per_page': 1, 'cursor': cursor}).status_code == 200
+        cursor = client.get('/api/reports', query_string={'per_page': 1, 'cursor': cursor}).json['next_cursor']
+
+
+def test_reports_pages_never_repeat_rows(client, admin):
+    with app.app_context():
+        # Rows written by the old CURRENT_TIMESTAMP default carry second-resolution text times; the
+        # normalize-report-times command pads them. Pages of 3 split inside a second.
+        for _ in range(3):
+            db.session.execute(db.text("INSERT INTO report (animal_type, description, location, contact, reporter_id, "
+                                       "report_time) VALUES ('Cat', 'paging', 'Jayanagar', '1', :reporter, "
+                                       "'2024-05-01 10:30:00')"), {'reporter': admin[0]})
+        db.session.add_all(Report(animal_type='Cat', description='paging', location='Jayanagar', contact='1',
+                                  reporter_id=admin[0]) for _ in range(6))
+        db.session.commit()
+        result = app.test_cli_runner().invoke(args=['normalize-report-times'])
+        assert result.output == 'Normalized 3 report times\n'
+        expected = Report.query.count()
+    seen, cursor = [], None
+    while True:
+        params = {'per_page': 3, 'cursor': cursor} if cursor else {'per_page': 3}
+        body = client.get('/api/reports', query_string=params).json
+        seen += [item['id'] for item in body['items']]
+        cursor = body['next_cursor']
+        assert len(seen) <= expected
+        if cursor is None:
+            break
+    assert len(seen) == len(set(seen)) == expected
+
+
+def test_search_ranks_prefix_matches(client):
+    for description in ('Injured kingfisher on the lake path', 'Kingfisher chick, kingfisher nest fell'):
+        client.post('/report_animal', data={
+            'animal_type': 'Bird', 'description': description, 'location': 'Koramangala', 'contact': '1',
+        })
+    items = client.get('/api/reports/search', query_string={'q': 'kingfish'}).json['items']
+    assert [item['description'] for item in items] == ['Kingfisher chick, kingfisher nest fell',
+                                                        'Injured kingfisher on the lake path']
+    items = client.get('/api/reports/search', query_string={'q': 'kingfisher lake'}).json['items']
+    assert [item['description'] for item in items] == ['Injured kingfisher on the lake path']
+    assert client.get('/api/reports/search', query_string={'q': '  '}).json['items'] == []
+
+
+def test_stats_api_validates_parameters(client):
+    for params in ({'metric': 'bogus'}, {'granularity': 'year'}, {'metric': 'reports', 'group_by': 'food_type'},
+                   {'from': '01-05-2024'}):
+        response = client.get('/api/stats', query_string=params)
+        assert response.status_code == 400, params
+        assert 'error' in response.json
+    response = client.get('/api/stats', query_string={'metric': 'reports', 'granularity': 'month'})
+    assert response.status_code == 200
+    assert response.json['metric'] == 'reports'
+    _, username = make_user()
+    assert login(username).get('/api/stats').status_code == 403
+
+
+def test_bumping_a_tag_only_invalidates_its_entries():
+    calls = []
+
+    def compute(name):
+        calls.append(name)
+        return {'name': name}
+    with app.app_context():
+        for _ in range(2):
+            stats_cache.get_or_compute('tagged', 'a', ['tag-a'], lambda: compute('a'))
+            stats_cache.get_or_compute('tagged', 'b', ['tag-b'], lambda: compute('b'))
+        assert calls == ['a', 'b']
+        bump_cache_version('tag-a')
+        db.session.commit()
+        stats_cache.get_or_compute('tagged', 'a', ['tag-a'], lambda: compute('a'))
+        stats_cache.get_or_compute('tagged', 'b', ['tag-b'], lambda: compute('b'))
+    assert calls == ['a', 'b', 'a']
+
+
+def test_heatmap_only_caches_known_filters(client):
+    assert client.get('/api/reports/heatmap', query_string={'days': 3}).status_code == 400
+    before = len(heatmap_cache._grids)
+    for i in range(5):
+        body = client.get('/api/reports/heatmap', query_string={'animal_type': f'unknown-{i}'}).json
+        assert body['points'] == []
+    assert len(heatmap_cache._grids) == before
+    assert client.get('/api/reports/heatmap', query_string={'animal_type': 'Dog', 'days': 7}).status_code == 200
+
+
+def test_heatmap_filters_on_the_normalized_facet_key(client):
+    response = client.post('/report_animal', data={
+        'animal_type': 'Street  Dog', 'description': 'Sleeping by the gate', 'location': 'Koramangala', 'contact': '1',
+    })
+    assert response.status_code == 302
+    body = client.get('/api/reports/heatmap', query_string={'animal_type': 'street dog'}).json
+    assert sum(count for _, _, count in body['points']) == 1
+
+
+def test_map_markers_match_the_selected_facet_exactly(client):
+    for animal_type in ('Hornbill', 'Hornbill  Chick'):
+        client.post('/report_animal', data={
+            'animal_type': animal_type, 'description': 'Fell from a tree', 'location': 'Koramangala', 'contact': '1',
+        })
+    params = {'bbox': '77.60,12.92,77.64,12.95', 'zoom': 17}
+    markers = client.get('/api/reports/geojson', query_string={**params, 'category': 'Hornbill'}).json['features']
+    assert [f['properties']['animal_type'] for f in markers] == ['Hornbill']
+    markers = client.get('/api/reports/geojson', query_string={**params, 'category': 'hornbill chick'}).json['features']
+    assert [f['properties']['animal_type'] for f in markers] == ['Hornbill  Chick']
+
+
+def test_backfill_checkpoint_stops_at_failed_lookup(monkeypatch, admin):
+    def resolve(address, remote=True, wait=True):
+        if address == 'Nowhere 2':
+            raise RuntimeError('provider down')
+        return (12.97, 77.59), 'test'
+    monkeypatch.setattr('app.resolve_with_providers', resolve)
+    with app.app_context():
+        reports = [Report(animal_type='Dog', description='backfill', location=f'Nowhere {i}', contact='1',
+                          reporter_id=admin[0]) for i in range(1, 4)]
+        db.session.add_all(reports)
+        db.session.commit()
+        backfill_coordinates('report', commit_every=1, restart=True)
+        assert db.session.get(BackfillCheckpoint, 'geocode:report').last_id == reports[0].id
+        assert [r.latitude is not None for r in Report.query.filter_by(description='backfill')] == [True, False, True]
+
+
+def test_geocode_cache_upsert_replaces_the_entry():
+    with app.app_context():
+        store_geocode_cache('12 MG Road', None, 'test')
+        store_geocode_cache('12  mg road', (12.97, 77.6), 'test')
+        db.session.commit()
+        entries = GeocodeCache.query.filter_by(normalized_address='12 mg road').all()
+        assert [(e.latitude, e.is_negative) for e in entries] == [(12.97, False)]
+
+
+def test_awards_move_ranks_and_window_boards():
+    leader, runner_up = make_user(), make_user()
+    with app.app_context():
+        award_points(db.session.get(User, leader[0]), 1000, 'report')
+        award_points(db.session.get(User, runner_up[0]), 900, 'report')
+        db.session.commit()
+        assert rank_index.rank(runner_up[0]) == rank_index.rank(leader[0]) + 1
+        award_points(db.session.get(User, runner_up[0]), 200, 'donation')
+        db.session.commit()
+        assert rank_index.rank(runner_up[0]) == rank_index.rank(leader[0]) - 1
+        for window in ('all', 'week', 'month'):
+            points = {row['user_id']: row['points'] for row in leaderboard_top(window, limit=100)}
+            assert (points[runner_up[0]], points[leader[0]]) == (1100, 1000), window
+
+
+def test_rolled_back_awards_never_reach_the_rank_index():
+    user_id, _ = make_user()
+    with app.app_context():
+        award_points(db.session.get(User, user_id), 50, 'report')
+        db.session.rollback()
+        db.session.commit()
+        assert rank_index._points[user_id] == 0
+
+
+def test_rank_award_survives_a_savepoint_rollback():
+    user_id, _ = make_user()
+    with app.app_context():
+        db.session.add(CacheVersion(tag='savepoint-test', version=0))
+        db.session.commit()
+        award_points(db.session.get(User, user_id), 7, 'report')
+        try:
+            with db.session.begin_nested():
+                db.session.add(CacheVersion(tag='savepoint-test', version=0))
+        except IntegrityError:
+            pass
+        db.session.commit()
+        assert rank_index._points[user_id] == 7
+
+
+def test_leaderboard_validates_the_window(client):
+    assert client.get('/leaderboard', query_string={'window': 'week'}).status_code == 200
+    assert client.get('/leaderboard', query_string={'window': 'year'}).status_code == 400
+    assert client.get('/leaderboard', query_string={'window': 'event'}).status_code == 400
+    assert client.get('/leaderboard', query_string={'window': 'week', 'event_id': 1}).status_code == 400
+
+
+def test_renaming_refreshes_cached_window_boards():
+    user_id, username = make_user()
+    with app.app_context():
+        award_points(db.session.get(User, user_id), 5, 'report')
+        db.session.commit()
+        assert {row['user_id']: row['username'] for row in leaderboard_top('week', limit=100)}[user_id] == username
+    login(username).post('/profile', data={'username': f'{username}-renamed', 'email': f'{username}@example.com'})
+    with app.app_context():
+        names = {row['user_id']: row['username'] for row in leaderboard_top('week', limit=100)}
+        assert names[user_id] == f'{username}-renamed'
+
+
+def test_profile_changes_refresh_the_cached_user():
+    user_id, username = make_user()
+    client = login(username)
+    with app.app_context():
+        assert load_user(str(user_id)).username == username
+    client.post('/profile', data={'username': f'{username}-new', 'email': f'{username}-new@example.com'})
+    with app.app_context():
+        assert load_user(str(user_id)).username == f'{username}-new'
+        assert load_user(str(user_id)).email == f'{username}-new@example.com'
+
+
+def test_login_rehashes_outdated_password_hashes():
+    user_id, username = make_user(pwhash=generate_password_hash('secret', 'pbkdf2:sha256:1000'))
+    login(username)
+    with app.app_context():
+        stored = db.session.get(User, user_id).password
+    assert not password_hasher.needs_rehash(stored)
+    assert password_hasher.verify(stored, 'secret')
+
+
+def test_saturated_password_pool_returns_503(monkeypatch):
+    _, username = make_user()
+    slots = threading.BoundedSemaphore(1)
+    slots.acquire()
+    monkeypatch.setattr(password_hasher, '_slots', slots)
+    response = app.test_client().post('/login', data={'username': username, 'password': 'secret'})
+    assert response.status_code == 503
+    assert response.headers['Retry-After'] == '1'
+
+
+def test_shared_rank_seed_keeps_other_workers_awards(tmp_path):
+    path = str(tmp_path / 'leaderboard.db')
+    first = RankIndex(SQLiteRankBackend(path))
+    first.seed([(1, 'asha', 10), (2, 'ravi', 5)])
+    first.add(2, 'ravi', 20)
+    second = RankIndex(SQLiteRankBackend(path))
+    second.seed([(1, 'asha', 10), (2, 'ravi', 5)])  # read before the award committed
+    assert second.rank(2) == 1
+    assert second.top(1) == [{'user_id': 2, 'username': 'ravi', 'points': 25}]
+
+
+def test_gazetteer_only_approximates_addresses_in_the_city():
+    gazetteer = GazetteerIndex(BENGALURU_GAZETTEER)
+    assert gazetteer.lookup('Mysore Palace, Mysuru') is None
+    assert gazetteer.approximate('Mysore Palace, Mysuru') is None
+    assert gazetteer.lookup('Koramangla 4th block, Bengaluru') is None
+    assert gazetteer.approximate('Koramangla 4th block, Bengaluru') == gazetteer.lookup('Koramangala')
+
+
+def test_hot_queries_use_indexes():
+    with app.app_context():
+        for label, query in hot_queries():
+            assert full_table_scans(explain_query_plan(query)) == [], label